@@ -0,0 +1,114 @@
+# Admin dashboard: rubric scores and reviewer statistics over every stored review
+# Reads the local columnar store (response_store.py) and scores it with scoring.py. Results are
+# cached with st.cache_data keyed on the store's version, so they are only recomputed after new
+# submissions arrive. Runs as its own app, apart from the reviewer form:
+#
+#     ADMIN_PASSWORD=... streamlit run admin_dashboard.py --server.port 8502
+#
+# The dashboard refuses to render unless ADMIN_PASSWORD is set.
+
+import hmac
+import os
+
+import streamlit as st
+
+import scoring
+import xlsx_export
+from form_schema import compile_schema
+from response_store import ResponseStore
+
+st.title("AP Review Admin Dashboard")
+
+admin_password = os.environ.get("ADMIN_PASSWORD")
+if not admin_password:
+    st.error("The admin dashboard is disabled: set ADMIN_PASSWORD to enable it.")
+    st.stop()
+entered = st.text_input("Admin password", type="password")
+if not hmac.compare_digest(entered.encode(), admin_password.encode()):
+    st.stop()
+
+
+@st.cache_resource
+def response_store():
+    return ResponseStore()
+
+
+@st.cache_resource
+def load_plan():
+    return compile_schema()
+
+
+@st.cache_resource
+def rubric_areas():
+    return scoring.rubric_columns(load_plan())
+
+
+@st.cache_data(max_entries=2)
+def load_scores(version):
+    # `version` only keys the cache: it changes whenever the reviewer app flushes new submissions
+    areas = rubric_areas()
+    needed = [scoring.COLLEGE, scoring.PROGRAM, scoring.REVIEWER, scoring.DURATION, "submitted_at"]
+    needed += [column for columns in areas.values() for column in columns]
+    frame = response_store().load(columns=needed)
+    per_reviewer, overall = scoring.duration_stats(frame)
+    return {
+        "reviews": len(frame),
+        "programs": scoring.rubric_scores(frame, areas, by="program"),
+        "colleges": scoring.rubric_scores(frame, areas, by="college"),
+        "agreement": scoring.reviewer_agreement(frame, areas),
+        "durations": per_reviewer,
+        "overall_duration": overall,
+    }
+
+
+store = response_store()
+# Rows logged by reviewer processes that have exited are still in JSONL; running reviewer apps flush
+# their own logs in the background
+store.flush()
+scores = load_scores(store.version())
+
+if not scores["reviews"]:
+    st.info("No reviews have been submitted yet.")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Reviews", scores["reviews"])
+col2.metric("Programs", len(scores["programs"]))
+col3.metric("Double-reviewed programs", len(scores["agreement"]))
+
+by_program, by_college, agreement, durations = st.tabs(
+    ["By program", "By college", "Inter-reviewer agreement", "Reviewer duration"]
+)
+with by_program:
+    st.dataframe(scores["programs"], hide_index=True, use_container_width=True)
+with by_college:
+    st.dataframe(scores["colleges"], hide_index=True, use_container_width=True)
+with agreement:
+    st.caption("Latest review of the first two reviewers of each program, over the rubric items both answered.")
+    st.dataframe(scores["agreement"], hide_index=True, use_container_width=True)
+with durations:
+    st.write("Minutes spent per review (as reported by reviewers)")
+    st.dataframe(scores["overall_duration"].to_frame("All reviews").T, use_container_width=True)
+    st.dataframe(scores["durations"], hide_index=True, use_container_width=True)
+
+
+# -------------------------------------- EXCEL EXPORT ----------------------------------
+st.subheader("Excel export")
+st.caption("One sheet per section; PSLO Quality and Methods and Measures have one row per review and PSLO.")
+if st.button("Prepare Excel export"):
+    # The workbook is streamed to a temp file; only its finished (compressed) bytes are kept, and the
+    # file is removed before the download button is shown. The button lives only in this run.
+    with st.spinner("Writing the workbook..."):
+        export_path = xlsx_export.export_store(store, load_plan())
+    try:
+        with open(export_path, "rb") as export_file:
+            workbook = export_file.read()
+    finally:
+        os.remove(export_path)
+    st.download_button(
+        "Download .xlsx",
+        workbook,
+        file_name="ap_peer_reviews.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+    )
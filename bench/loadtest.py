@@ -0,0 +1,201 @@
+# Load test for formapp.py against a local Power Automate stand-in
+# Simulated reviewers fill the form headlessly with streamlit.testing.v1.AppTest (one AppTest per
+# reviewer session, spread over worker processes) and submit to bench/stub_logic_app.py.
+# Reports per-rerun latency percentiles, submission throughput and memory per session.
+#
+# Memory is traced with tracemalloc after one discarded warm-up session per worker process, so import
+# and cache costs are not charged to the first reviewer. "retained" is what the finished session
+# still holds (traced memory released by dropping it), "peak" the high-water mark above the baseline
+# while it ran; both are non-negative by construction.
+#
+# AppTest always re-runs the whole script (fragments are not scoped there), so the rerun latencies
+# are an upper bound for what a reviewer waits on after each answer.
+#
+# Usage: python bench/loadtest.py [--reviewers 12] [--processes 4] [--pslos 2 10 28]
+#                                 [--latency 0.3] [--rate-429 0.05] [--rate-5xx 0.02]
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from stub_logic_app import StubLogicApp
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(REPO_DIR, "formapp.py")
+sys.path.insert(0, REPO_DIR)
+
+import delivery  # noqa: E402
+
+
+# ------------------------------------SIMULATED REVIEWER-------------------------------------------------
+def _answer(at, question, rng):
+    if question.widget == "radio":
+        at.radio(key=question.key).set_value(rng.choice(question.choices))
+    elif question.widget in ("text_input", "text_area"):
+        widget = at.text_input(key=question.key) if question.widget == "text_input" else at.text_area(key=question.key)
+        widget.input(f"Answer {rng.randint(1, 1000)}")
+
+
+def _answer_section(at, section, rng, overrides=None):
+    state = {}
+    for question in section.questions:
+        if question.widget in ("computed", "multiselect"):
+            continue
+        if question.show_if and state.get(question.show_if[0]) != question.show_if[1]:
+            continue
+        if overrides and question.key in overrides:
+            at.radio(key=question.key).set_value(overrides[question.key])
+            state[question.key] = overrides[question.key]
+            continue
+        _answer(at, question, rng)
+
+
+def _timed_run(at, timings):
+    start = time.perf_counter()
+    at.run()
+    timings.append((time.perf_counter() - start) * 1000)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def simulate_reviewer(reviewer, num_pslos, seed, submit=True):
+    from streamlit.testing.v1 import AppTest
+    from form_schema import FORM_LAYOUT, PsloLoop, compile_schema
+
+    plan = compile_schema()
+    rng = random.Random(seed)
+    timings = []
+    gc.collect()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    at = AppTest.from_file(APP_FILE, default_timeout=120)
+    _timed_run(at, timings)
+
+    no_branch = {"yearly_assessment_complete": "Yes", "appendix_pslo_description": "Yes"}
+    for part in FORM_LAYOUT:
+        if not isinstance(part, PsloLoop):
+            _answer_section(at, part, rng, no_branch)
+            if part.id == "identifiers":
+                at.text_input(key="reviewer_name").input(f"Load Test Reviewer {reviewer}")
+            _timed_run(at, timings)
+            continue
+
+        # One rerun per PSLO block, answering the block and its "more PSLOs" question together
+        for i in range(1, num_pslos + 1):
+            _answer_section(at, plan.blocks[(part.id, i)], rng, {f"additional_measures_pslo{i}": "No"})
+            more = part.gate if i == 2 else plan.more.get((part.id, i))
+            if more is not None:
+                at.radio(key=more.key).set_value("Yes" if i < num_pslos else "No")
+            _timed_run(at, timings)
+
+    submitted = False
+    if submit:
+        next(button for button in at.button if button.label == "Submit Full Form").click()
+        _timed_run(at, timings)
+        submitted = any("successfully submitted" in str(message.value) for message in at.success)
+
+    held, peak = tracemalloc.get_traced_memory()
+    del at
+    gc.collect()
+    retained = max(0, held - tracemalloc.get_traced_memory()[0])
+    return {"timings": timings, "retained_bytes": retained, "peak_bytes": max(0, peak - baseline), "submitted": submitted}
+
+
+def run_reviewers(jobs):
+    tracemalloc.start()
+    # Warm-up: the first session in a process pays for imports and Streamlit's caches; it is not
+    # submitted and its numbers are discarded
+    if jobs:
+        reviewer, num_pslos, seed = jobs[0]
+        simulate_reviewer(-1 - reviewer, num_pslos, seed, submit=False)
+    return [simulate_reviewer(*job) for job in jobs]
+
+
+# ------------------------------------REPORT-------------------------------------------------
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _stub_stats(url):
+    with urllib.request.urlopen(url + "stats") as response:
+        return json.load(response)
+
+
+def run_scenario(args, num_pslos, stub):
+    jobs = [(reviewer, num_pslos, args.seed + reviewer) for reviewer in range(args.reviewers)]
+    chunks = [jobs[n::args.processes] for n in range(args.processes)]
+    received_before = stub.stats()["records"]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes, mp_context=get_context("spawn")) as pool:
+        results = [result for chunk in pool.map(run_reviewers, chunks) for result in chunk]
+    filled = time.perf_counter() - start
+
+    submitted = sum(result["submitted"] for result in results)
+    deadline = time.perf_counter() + args.delivery_timeout
+    while stub.stats()["records"] - received_before < submitted and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    delivered = stub.stats()["records"] - received_before
+    total = time.perf_counter() - start
+
+    timings = [t for result in results for t in result["timings"]]
+    retained = [result["retained_bytes"] for result in results]
+    peak = [result["peak_bytes"] for result in results]
+    print(f"\n=== {args.reviewers} reviewers x {num_pslos} PSLOs ({args.processes} processes) ===")
+    print(f"reruns:      {len(timings)} total, {len(timings) / len(results):.0f} per reviewer")
+    print(f"rerun ms:    p50 {_percentile(timings, 50):.1f}  p90 {_percentile(timings, 90):.1f}  "
+          f"p99 {_percentile(timings, 99):.1f}  max {max(timings):.1f}")
+    print(f"submitted:   {submitted}/{len(results)} acknowledged in the UI, {delivered} received by the stub")
+    print(f"throughput:  {delivered / total:.2f} submissions/s end to end ({filled:.1f}s filling, {total:.1f}s total)")
+    print(f"memory:      {statistics.mean(retained) / 1024:.0f} KiB retained, {statistics.mean(peak) / 1024:.0f} KiB peak "
+          f"per session (mean traced, after a warm-up session)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test formapp.py against a local Logic App stand-in.")
+    parser.add_argument("--reviewers", type=int, default=12)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--pslos", type=int, nargs="+", default=[2, 10, 28])
+    parser.add_argument("--latency", type=float, default=0.3, help="stub seconds per request")
+    parser.add_argument("--rate-429", type=float, default=0.05)
+    parser.add_argument("--rate-5xx", type=float, default=0.02)
+    parser.add_argument("--delivery-timeout", type=float, default=120, help="seconds to wait for the outbox to drain")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    stub = StubLogicApp(latency=args.latency, rate_429=args.rate_429, rate_5xx=args.rate_5xx, seed=args.seed)
+    stub.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Read by delivery.py, response_store.py, draft_store.py and state_backend.py when the worker
+        # processes import them, so a run never writes into the repo's real stores
+        os.environ["POWER_AUTOMATE_URL"] = stub.url
+        os.environ["OUTBOX_FILE"] = os.path.join(tmp, "outbox.db")
+        os.environ["RESPONSE_STORE_DIR"] = os.path.join(tmp, "reviewer_responses")
+        os.environ["DRAFT_FILE"] = os.path.join(tmp, "review_drafts.db")
+        if os.environ.get("SESSION_STATE_BACKEND") == "sqlite":
+            os.environ["SESSION_STATE_FILE"] = os.path.join(tmp, "session_state.db")
+
+        # Reviewer processes exit once their sessions are done; this worker drains what they queued
+        drain = delivery.start_worker(stub.url, os.environ["OUTBOX_FILE"])
+        for num_pslos in args.pslos:
+            run_scenario(args, num_pslos, stub)
+        print(f"\nstub: {_stub_stats(stub.url)}")
+        print(f"outbox: {drain.outbox.counts()}  delivery: {drain.stats.summary()}")
+        drain.stop()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
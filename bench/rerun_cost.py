@@ -0,0 +1,187 @@
+# Rerun cost measurement for formapp.py
+# Starts the app under `streamlit run` with METRICS_FILE set and drives one headless session per PSLO
+# count over Streamlit's websocket protocol, the same messages a browser sends. The timings are the
+# server-side script times recorded by metrics.py ("rerun" events), one per rerun:
+#   - full page run (kind=full): what every answer cost before fragments, and what a change outside
+#     the PSLO loops still costs
+#   - block fragment (kind=fragment): answering a question inside one PSLO block re-runs only that
+#     block; this should stay flat as the PSLO count grows
+#   - loop fragment (kind=fragment): answering a "more PSLOs" question (adding a PSLO) re-runs the
+#     whole loop fragment, every block of that loop included, so it still grows with the count (O(n))
+# Each session is brought to N PSLOs by restoring a seeded draft (draft_store.py), then every kind
+# of rerun is repeated and the median reported.
+#
+# Measured in the dev container (--repeat 5):
+#   PSLOs  full page run  block fragment  loop fragment (add PSLO)
+#       2        58 ms          5 ms            19 ms
+#      10       334 ms          8 ms           183 ms
+#      28      1606 ms         15 ms          1020 ms
+#
+# Usage: python bench/rerun_cost.py [--counts 2 10 28] [--repeat 10]
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from websockets.sync.client import connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(REPO_DIR, "formapp.py")
+sys.path.insert(0, REPO_DIR)
+
+from draft_store import DraftStore, draft_key  # noqa: E402
+from form_schema import compile_schema  # noqa: E402
+
+REVIEWER = "Rerun Bench"
+
+
+# ------------------------------------SERVER-------------------------------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(tmp, port):
+    env = {
+        **os.environ,
+        "METRICS_FILE": os.path.join(tmp, "metrics.jsonl"),
+        "DRAFT_FILE": os.path.join(tmp, "review_drafts.db"),
+        "OUTBOX_FILE": os.path.join(tmp, "outbox.db"),
+        "RESPONSE_STORE_DIR": os.path.join(tmp, "reviewer_responses"),
+        "PROGRAM_CATALOG": os.path.join(tmp, "no_catalog.csv"),
+        "POWER_AUTOMATE_URL": "http://127.0.0.1:9/unused",
+        "SESSION_STATE_BACKEND": "",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_FILE, "--server.headless", "true", "--server.port", str(port),
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit did not start")
+
+
+# ------------------------------------SESSION-------------------------------------------------
+class Session:
+    # A minimal browser stand-in: keeps the widget values it has set and the fragment of every widget
+    def __init__(self, ws, metrics_file):
+        self.ws = ws
+        self.metrics_file = metrics_file
+        self.offset = os.path.getsize(metrics_file) if os.path.exists(metrics_file) else 0
+        self.page_hash = ""
+        self.widgets = {}      # widget key -> (widget id, fragment id)
+        self.values = {}       # widget id -> string value sent with every rerun
+
+    def rerun(self, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.fragment_id = fragment_id
+        for widget_id, value in self.values.items():
+            msg.rerun_script.widget_states.widgets.add(id=widget_id, string_value=value)
+        self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(self.ws.recv(timeout=120))
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.main_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = getattr(fwd.delta.new_element, fwd.delta.new_element.WhichOneof("type"))
+                widget_id = getattr(element, "id", "")
+                if widget_id.startswith("$$ID-"):
+                    self.widgets[widget_id.split("-", 2)[2]] = (widget_id, fwd.delta.fragment_id)
+            elif kind == "script_finished":
+                return self.records()
+
+    def set(self, key, value, in_fragment=True):
+        widget_id, fragment_id = self.widgets[key]
+        self.values[widget_id] = value
+        return self.rerun(fragment_id if in_fragment else "")
+
+    def records(self):
+        # "rerun" events appended to METRICS_FILE by this run
+        with open(self.metrics_file, encoding="utf-8") as f:
+            f.seek(self.offset)
+            lines = f.readlines()
+            self.offset = f.tell()
+        return [event for event in map(json.loads, lines) if event["event"] == "rerun"]
+
+
+def timed(records, kind):
+    [record] = [r for r in records if r["kind"] == kind]
+    return record["seconds"] * 1000, record["widgets"]
+
+
+def measure(port, metrics_file, num_pslos, repeat):
+    program = f"Program with {num_pslos} PSLOs"
+    DraftStore(os.environ["DRAFT_FILE"]).save(draft_key(REVIEWER, program), compile_schema().pslo_prefill(num_pslos))
+
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws, metrics_file)
+        session.rerun()
+        session.set("reviewer_name", REVIEWER, in_fragment=False)
+        session.set("program_name", program, in_fragment=False)      # restores the seeded draft
+        block_key = f"pslo{max(num_pslos, 1)}_q1"
+        loop_fragment = session.widgets["more_pslo_2"][1]
+        full, block, loop = [], [], []
+        for n in range(repeat + 1):
+            results = (
+                timed(session.rerun(), "full"),
+                timed(session.set(block_key, ("Yes", "No")[n % 2]), "fragment"),
+                timed(session.rerun(loop_fragment), "fragment"),
+            )
+            if n:    # the first round warms caches up
+                for samples, result in zip((full, block, loop), results):
+                    samples.append(result)
+    median = lambda samples: statistics.median(ms for ms, _ in samples)
+    return {
+        "full": (median(full), full[0][1]),
+        "block": (median(block), block[0][1]),
+        "loop": (median(loop), loop[0][1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure full page and fragment reruns of formapp.py under streamlit run.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[2, 10, 28])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DRAFT_FILE"] = os.path.join(tmp, "review_drafts.db")
+        port = free_port()
+        server = start_server(tmp, port)
+        try:
+            print(f"{'PSLOs':>5}  {'full page run':>20}  {'block fragment':>20}  {'loop fragment (add PSLO)':>26}")
+            print(f"{'':>5}  {'ms (widgets)':>20}  {'ms (widgets)':>20}  {'ms (widgets)':>26}")
+            for num_pslos in args.counts:
+                result = measure(port, os.path.join(tmp, "metrics.jsonl"), num_pslos, args.repeat)
+                cells = [f"{ms:.1f} ({widgets})" for ms, widgets in (result["full"], result["block"], result["loop"])]
+                print(f"{num_pslos:>5}  {cells[0]:>20}  {cells[1]:>20}  {cells[2]:>26}")
+        finally:
+            server.terminate()
+            server.wait()
+    print("\nServer-side script time of one rerun (metrics.py), median. A block fragment re-runs one PSLO block;")
+    print("answering a \"more PSLOs\" question re-runs the whole loop fragment, so that cost is O(PSLOs).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Local stand-in for the Power Automate / Logic App HTTP trigger
+# Accepts the same JSON submissions as the real flow (single objects, or arrays in batched delivery
+# mode; wide or compact, optionally gzipped) with configurable latency and failure rates, and counts
+# what it received.
+#   POST /          -> 202 for a single submission, 200 with per-record results for a batch
+#   GET  /stats     -> {"requests": ..., "records": ..., "429": ..., "5xx": ...}
+#
+# Usage: python bench/stub_logic_app.py [--port 8765] [--latency 0.2] [--rate-429 0.05] [--rate-5xx 0.02]
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLogicApp(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.2, jitter=0.1, rate_429=0.0, rate_5xx=0.0, seed=None):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "records": 0, "bytes": 0, "429": 0, "5xx": 0}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counts[name] += amount
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="stub-logic-app", daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real endpoint
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._reply(200, self.server.stats())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.count("requests")
+        server.count("bytes", len(body))
+        time.sleep(max(0.0, server.latency + server.random.uniform(-server.jitter, server.jitter)))
+
+        roll = server.random.random()
+        if roll < server.rate_429:
+            server.count("429")
+            self._reply(429, {"error": "Rate limit is exceeded."}, {"Retry-After": "1"})
+            return
+        if roll < server.rate_429 + server.rate_5xx:
+            server.count("5xx")
+            self._reply(502, {"error": "Bad gateway"})
+            return
+
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)
+        except (OSError, ValueError):
+            self._reply(400, {"error": "invalid JSON"})
+            return
+
+        if isinstance(payload, list):
+            server.count("records", len(payload))
+            self._reply(200, {"results": [{"id": item.get("id"), "status": 200} for item in payload]})
+        else:
+            server.count("records")
+            self._reply(202)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Power Automate HTTP trigger.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLogicApp((args.host, args.port), args.latency, args.jitter, args.rate_429, args.rate_5xx)
+    print(f"Stub Logic App listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
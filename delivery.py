@@ -0,0 +1,469 @@
+# Submission outbox and background delivery to the Power Automate flow
+# A submission is written to a local SQLite outbox first, so the Streamlit script thread returns as
+# soon as the record is durable. A background DeliveryWorker posts due records through one shared
+# requests.Session (keep-alive, pooled connections) with connect/read timeouts, retries failures with
+# exponential backoff and moves records that keep failing to the dead-letter list (status "dead").
+# With BATCH_MODE on, queued records are coalesced over a window into one array payload per request
+# and acknowledged one by one, so a partial failure only retries the records that failed. A batch
+# rejected as a whole is resent record by record, and retries are always sent on their own.
+# SUBMISSION_WIRE_FORMAT=compact sends the versioned compact encoding from wire_format.py instead of
+# the wide column layout, and SUBMISSION_GZIP=1 gzips request bodies.
+# Every submission carries an idempotency key: the outbox accepts each key once, so double clicks
+# and resubmissions never reach the network, and the key is forwarded (Idempotency-Key header and
+# payload field) so the flow can dedupe too.
+# Request durations and press-to-acknowledgement times are recorded in metrics.py.
+# formapp.py starts a single worker per server process (start_delivery).
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+import wire_format
+
+logger = logging.getLogger(__name__)
+
+POWER_AUTOMATE_URL = os.environ.get(
+    "POWER_AUTOMATE_URL",
+    "https://prod-69.westus.logic.azure.com:443/workflows/b18fd281e82b456dbc7b4dea66ee5878/triggers/manual/paths/invoke?api-version=2016-06-01&sp=%2Ftriggers%2Fmanual%2Frun&sv=1.0&sig=j7KYXt6mfF97vPq1r0wnOQFkACB-jleAxA8fTyxut8M",
+)
+OUTBOX_FILE = os.environ.get("OUTBOX_FILE", "submission_outbox.db")
+
+CONNECT_TIMEOUT = 5      # seconds
+READ_TIMEOUT = 60        # seconds, the flow can be slow during review week
+MAX_ATTEMPTS = 8         # then the record goes to the dead-letter list
+BACKOFF_BASE = 2         # seconds, doubled on every failed attempt
+BACKOFF_MAX = 600        # seconds
+LEASE_SECONDS = 120      # a claimed record is retried by any worker if not settled by then
+POLL_INTERVAL = 5        # seconds between outbox scans when nobody wakes the worker
+POOL_SIZE = 4
+IDEMPOTENCY_RETENTION_DAYS = 30   # delivered records (and their keys) are kept this long
+IDEMPOTENCY_FIELD = "Idempotency Key"
+
+# Batched delivery: one flow run per batch instead of one per review
+BATCH_MODE = os.environ.get("SUBMISSION_BATCH_MODE", "0") == "1"
+BATCH_WINDOW_SECONDS = float(os.environ.get("SUBMISSION_BATCH_WINDOW", "30"))
+BATCH_MAX_RECORDS = int(os.environ.get("SUBMISSION_BATCH_MAX", "25"))
+
+# What goes over the wire: "wide" (one column per English sentence) or "compact" (wire_format.py)
+WIRE_FORMAT = os.environ.get("SUBMISSION_WIRE_FORMAT", "wide")
+GZIP_BODIES = os.environ.get("SUBMISSION_GZIP", "0") == "1"
+
+PENDING, SENDING, DELIVERED, DEAD = "pending", "sending", "delivered", "dead"
+
+
+# ------------------------------------OUTBOX-------------------------------------------------
+class Outbox:
+    def __init__(self, path=OUTBOX_FILE):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    delivered_at REAL,
+                    last_status INTEGER,
+                    last_error TEXT,
+                    idempotency_key TEXT
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "idempotency_key" not in columns:
+                conn.execute("ALTER TABLE outbox ADD COLUMN idempotency_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS outbox_idempotency ON outbox (idempotency_key)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, payload, idempotency_key=None):
+        # Returns (record id, True) for a new record, or the existing record's (id, False) for a repeat
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (payload, created_at, next_attempt_at, idempotency_key) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (idempotency_key) DO NOTHING",
+                (json.dumps(payload), now, now, idempotency_key),
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid, True
+            row = conn.execute("SELECT id FROM outbox WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+            return row[0], False
+
+    def find(self, idempotency_key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, created_at, delivered_at FROM outbox WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return dict(zip(("id", "status", "created_at", "delivered_at"), row)) if row else None
+
+    def purge_delivered(self, days=IDEMPOTENCY_RETENTION_DAYS):
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND delivered_at < ?", (DELIVERED, time.time() - days * 86400)
+            ).rowcount
+
+    def claim_due(self, limit=20):
+        # Pending records whose retry time has come, plus claims abandoned by a crashed worker
+        now = time.time()
+        lease = now + LEASE_SECONDS
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, payload, attempts, created_at, idempotency_key FROM outbox "
+                "WHERE status IN (?, ?) AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, SENDING, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = ?, next_attempt_at = ? WHERE id = ?",
+                [(SENDING, lease, row[0]) for row in rows],
+            )
+        return [
+            {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2], "created_at": row[3], "key": row[4], "lease": lease}
+            for row in rows
+        ]
+
+    def renew_lease(self, record):
+        # Called before each send of a record claimed in a batch, so its lease covers that send.
+        # False when the lease already expired and the record may belong to another worker now.
+        lease = time.time() + LEASE_SECONDS
+        with self._connect() as conn:
+            renewed = conn.execute(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ? AND status = ? AND next_attempt_at = ?",
+                (lease, record["id"], SENDING, record["lease"]),
+            ).rowcount
+        if renewed:
+            record["lease"] = lease
+        return bool(renewed)
+
+    def due_summary(self):
+        # (number of records due now, when the oldest of them became due)
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*), MIN(next_attempt_at) FROM outbox WHERE status IN (?, ?) AND next_attempt_at <= ?",
+                (PENDING, SENDING, time.time()),
+            ).fetchone()
+
+    def mark_delivered(self, record_id, status_code):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, delivered_at = ?, last_status = ?, last_error = NULL WHERE id = ?",
+                (DELIVERED, time.time(), status_code, record_id),
+            )
+
+    def mark_failed(self, record_id, attempts, error, status_code=None, retry=True, retry_after=None):
+        attempts += 1
+        if retry and attempts < MAX_ATTEMPTS:
+            delay = retry_after if retry_after is not None else min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+            status, next_attempt_at = PENDING, time.time() + delay + random.uniform(0, 1)
+        else:
+            status, next_attempt_at = DEAD, time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_status = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_attempt_at, status_code, str(error)[:1000], record_id),
+            )
+        return status
+
+    def dead_letters(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, created_at, attempts, last_status, last_error FROM outbox WHERE status = ? ORDER BY id",
+                (DEAD,),
+            ).fetchall()
+
+    def requeue_dead(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ? WHERE status = ?",
+                (PENDING, time.time(), DEAD),
+            ).rowcount
+
+    def counts(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+
+# ------------------------------------HTTP-------------------------------------------------
+def make_session(pool_size=POOL_SIZE):
+    # One pooled keep-alive session per process: no TLS handshake per submission
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def idempotency_key(form_instance, reviewer, college, program):
+    # Stable for one form instance and program, so a double click or resubmission maps to the same key
+    identity = "|".join(" ".join(str(part or "").lower().split()) for part in (reviewer, college, program))
+    return hashlib.sha256(f"{form_instance}|{identity}".encode()).hexdigest()[:32]
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(status_code):
+    return status_code in (408, 425, 429) or status_code >= 500
+
+
+def _is_success(status_code):
+    return status_code in (200, 202)
+
+
+def _batch_results(response):
+    # The flow may acknowledge a batch per record, as [{"id": 12, "status": 200}, ...] or
+    # {"results": [...]}; without that the HTTP status applies to every record in the batch.
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    if isinstance(body, dict):
+        body = body.get("results")
+    if not isinstance(body, list):
+        return None
+    results = {}
+    for item in body:
+        if isinstance(item, dict) and "id" in item:
+            try:
+                results[int(item["id"])] = int(item.get("status", 200))
+            except (TypeError, ValueError):
+                continue
+    return results
+
+
+# ------------------------------------COUNTERS-------------------------------------------------
+class DeliveryStats:
+    def __init__(self, samples=1000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.records = 0
+        self.delivered = 0
+        self.failed = 0
+        self._latencies = deque(maxlen=samples)
+
+    def record_request(self, records):
+        with self._lock:
+            self.requests += 1
+            self.records += records
+
+    def record_result(self, created_at, delivered):
+        with self._lock:
+            if delivered:
+                self.delivered += 1
+                # End-to-end: from the reviewer pressing Submit to the flow acknowledging the record
+                latency = time.time() - created_at
+                self._latencies.append(latency)
+                metrics.observe("delivery_end_to_end_seconds", latency)
+            else:
+                self.failed += 1
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            summary = {
+                "requests": self.requests,
+                "records": self.records,
+                "records_per_request": round(self.records / self.requests, 2) if self.requests else 0.0,
+                "delivered": self.delivered,
+                "failed": self.failed,
+            }
+        if latencies:
+            summary["latency_p50_s"] = round(latencies[len(latencies) // 2], 3)
+            summary["latency_p95_s"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+            summary["latency_max_s"] = round(latencies[-1], 3)
+        return summary
+
+
+# ------------------------------------WORKER-------------------------------------------------
+class DeliveryWorker(threading.Thread):
+    def __init__(self, outbox, url=POWER_AUTOMATE_URL, session=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 batch_mode=BATCH_MODE, batch_window=BATCH_WINDOW_SECONDS, batch_max=BATCH_MAX_RECORDS,
+                 wire=WIRE_FORMAT, compress=GZIP_BODIES):
+        super().__init__(name="submission-delivery", daemon=True)
+        self.outbox = outbox
+        self.url = url
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.batch_mode = batch_mode
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self.wire = wire
+        self.compress = compress
+        self.stats = DeliveryStats()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def submit(self, payload, idempotency_key=None):
+        # Returns (record id, created); a repeated key is short-circuited before any network call
+        record_id, created = self.outbox.add(payload, idempotency_key)
+        if created:
+            self._wake.set()
+        return record_id, created
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                wait = self.deliver_due()
+            except Exception:
+                logger.exception("Submission delivery pass failed")
+                wait = POLL_INTERVAL
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def deliver_due(self):
+        # Returns how long to sleep before the next pass
+        if not self.batch_mode:
+            # One record per claim: a send can take up to connect + read timeout, so leasing several
+            # at once would let later leases expire (and another worker re-send them) while waiting
+            while not self._stopping.is_set():
+                records = self.outbox.claim_due(limit=1)
+                if not records:
+                    break
+                self.deliver(records[0])
+            return POLL_INTERVAL
+
+        due, oldest = self.outbox.due_summary()
+        if not due:
+            return POLL_INTERVAL
+        window_left = oldest + self.batch_window - time.time()
+        if due < self.batch_max and window_left > 0:
+            return min(window_left, POLL_INTERVAL)
+        records = self.outbox.claim_due(limit=self.batch_max)
+        if records:
+            self.deliver_batch(records)
+        return 0 if due > len(records) else POLL_INTERVAL
+
+    def _settle(self, record, status_code, error, retry_after=None):
+        if _is_success(status_code or 0):
+            self.outbox.mark_delivered(record["id"], status_code)
+            self.stats.record_result(record["created_at"], True)
+            return
+        status = self.outbox.mark_failed(
+            record["id"], record["attempts"], error, status_code,
+            retry=status_code is None or _is_retryable(status_code), retry_after=retry_after,
+        )
+        self.stats.record_result(record["created_at"], False)
+        logger.warning("Submission %s not delivered (%s), now %s", record["id"], status_code or error, status)
+
+    def _encode(self, record):
+        # The outbox always keeps the wide layout; the compact encoding is applied when sending
+        if self.wire == "compact":
+            body = wire_format.encode(record["payload"])
+            if record["key"]:
+                body["k"] = record["key"]
+            return body
+        if record["key"]:
+            return {**record["payload"], IDEMPOTENCY_FIELD: record["key"]}
+        return record["payload"]
+
+    def _post(self, body, key=None):
+        data = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode()
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if key:
+            headers["Idempotency-Key"] = key
+        if self.compress:
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        return self.session.post(self.url, data=data, headers=headers, timeout=self.timeout)
+
+    def _observe_request(self, started, mode, records, status_code):
+        seconds = time.perf_counter() - started
+        status = str(status_code) if status_code else "error"
+        metrics.observe("delivery_request_seconds", seconds, mode=mode, status=status)
+        metrics.record("delivery", mode=mode, records=records, status=status, seconds=round(seconds, 6))
+
+    def deliver(self, record):
+        self.stats.record_request(1)
+        started = time.perf_counter()
+        try:
+            response = self._post(self._encode(record), record["key"])
+        except requests.RequestException as e:
+            self._observe_request(started, "single", 1, None)
+            self._settle(record, None, e)
+            return
+        self._observe_request(started, "single", 1, response.status_code)
+        self._settle(record, response.status_code, response.text, _retry_after(response))
+
+    def _deliver_each(self, records):
+        for record in records:
+            if self._stopping.is_set():
+                break
+            if self.outbox.renew_lease(record):
+                self.deliver(record)
+
+    def deliver_batch(self, records):
+        # Records that already failed once are sent on their own, so one bad record can't keep
+        # failing the batches it lands in
+        retries = [record for record in records if record["attempts"]]
+        records = [record for record in records if not record["attempts"]]
+        if records:
+            self._post_batch(records)
+        self._deliver_each(retries)
+
+    def _post_batch(self, records):
+        self.stats.record_request(len(records))
+        body = [{"id": record["id"], "key": record["key"], "data": self._encode(record)} for record in records]
+        started = time.perf_counter()
+        try:
+            response = self._post(body)
+        except requests.RequestException as e:
+            self._observe_request(started, "batch", len(records), None)
+            for record in records:
+                self._settle(record, None, e)
+            return
+        self._observe_request(started, "batch", len(records), response.status_code)
+
+        if not _is_success(response.status_code) and not _is_retryable(response.status_code):
+            # Rejected as a whole (e.g. a 400 caused by one malformed record): resend every record on
+            # its own, so only the records that fail by themselves are retried or dead-lettered
+            logger.warning("Batch of %s rejected with %s, delivering its records one by one", len(records), response.status_code)
+            self._deliver_each(records)
+            return
+
+        results = _batch_results(response) if _is_success(response.status_code) else None
+        for record in records:
+            if results is None:
+                self._settle(record, response.status_code, response.text, _retry_after(response))
+            elif record["id"] in results:
+                self._settle(record, results[record["id"]], "rejected in batch")
+            else:
+                self._settle(record, None, "missing from batch acknowledgement")
+
+
+def start_worker(url=POWER_AUTOMATE_URL, outbox_file=OUTBOX_FILE):
+    outbox = Outbox(outbox_file)
+    outbox.purge_delivered()
+    worker = DeliveryWorker(outbox, url)
+    worker.start()
+    return worker
@@ -0,0 +1,104 @@
+# Crash-safe draft autosave for reviews in progress
+# Answers are stored as delta records (one row per changed widget value) in a local SQLite WAL
+# database, keyed by reviewer + program. A draft is restored with one query that picks the latest
+# value of every widget, and superseded deltas are compacted away as a draft grows.
+# All sessions of a process share one store and its single connection (see load_draft_store).
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DRAFT_FILE = os.environ.get("DRAFT_FILE", "review_drafts.db")
+COMPACT_EVERY = 200          # delta rows written to one draft between compactions
+MAX_DRAFT_AGE_DAYS = 60      # untouched drafts older than this are dropped when the store opens
+
+
+def draft_key(reviewer, program):
+    reviewer = " ".join(str(reviewer or "").lower().split())
+    program = " ".join(str(program or "").lower().split())
+    if not reviewer or not program:
+        return None
+    return f"{reviewer}|{program}"
+
+
+class DraftStore:
+    def __init__(self, path=DRAFT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = {}
+        # One connection shared by every session thread; synchronous=NORMAL in WAL mode only syncs
+        # at checkpoints, which keeps a delta write well under a millisecond
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS draft_deltas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                draft_key TEXT NOT NULL,
+                widget_key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS draft_deltas_key ON draft_deltas (draft_key, widget_key, id)")
+        self.prune()
+
+    def save(self, key, changes):
+        if not changes:
+            return
+        now = time.time()
+        rows = [(key, widget_key, json.dumps(value), now) for widget_key, value in changes.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO draft_deltas (draft_key, widget_key, value, updated_at) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                # The connection is shared by every session: a transaction left open would make
+                # every later BEGIN fail
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._writes[key] = self._writes.get(key, 0) + len(rows)
+            if self._writes[key] >= COMPACT_EVERY:
+                self._compact(key)
+
+    def load(self, key):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT widget_key, value FROM draft_deltas WHERE id IN "
+                "(SELECT MAX(id) FROM draft_deltas WHERE draft_key = ? GROUP BY widget_key)",
+                (key,),
+            ).fetchall()
+        return {widget_key: json.loads(value) for widget_key, value in rows}
+
+    def discard(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM draft_deltas WHERE draft_key = ?", (key,))
+            self._writes.pop(key, None)
+
+    def _compact(self, key):
+        # Keep only the latest delta of every widget
+        self._conn.execute(
+            "DELETE FROM draft_deltas WHERE draft_key = ? AND id NOT IN "
+            "(SELECT MAX(id) FROM draft_deltas WHERE draft_key = ? GROUP BY widget_key)",
+            (key, key),
+        )
+        self._writes[key] = 0
+
+    def compact(self, key):
+        with self._lock:
+            self._compact(key)
+
+    def prune(self, max_age_days=MAX_DRAFT_AGE_DAYS):
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM draft_deltas WHERE draft_key IN "
+                "(SELECT draft_key FROM draft_deltas GROUP BY draft_key HAVING MAX(updated_at) < ?)",
+                (cutoff,),
+            )
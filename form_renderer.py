@@ -0,0 +1,343 @@
+# Renders the peer review form described in form_schema.py
+# The compiled plan is built once per process (st.cache_resource); each rerun only walks it and makes
+# the widget calls. Each PSLO loop is an st.fragment with one nested st.fragment per PSLO block, so
+# answering a question in a PSLO block only re-runs that block, and adding a PSLO only re-runs its
+# loop, instead of the whole formapp.py script.
+# Every widget is keyed; answers are collected from st.session_state with Plan.collect().
+# Answers are autosaved as a draft (draft_store.py) once reviewer and program are known.
+# With a program catalog (program_catalog.py), college and program are picked from a search box,
+# which also prefills the number of PSLO blocks.
+# With SESSION_STATE_BACKEND set, progress is also mirrored to a store shared by all replicas under
+# the reviewer's ?token= (state_backend.py), so any replica can continue the session.
+# Every run is measured by metrics.py (wall time, widgets, PSLO blocks, session-state size).
+
+import logging
+import os
+import time
+import uuid
+
+import streamlit as st
+
+import metrics
+from draft_store import DraftStore, draft_key
+from form_schema import MAX_PSLOS, PsloLoop, compile_schema
+from program_catalog import PROGRAM_CATALOG, CatalogIndex, read_catalog
+from state_backend import new_token, open_backend, valid_token
+
+
+@st.cache_resource
+def load_plan():
+    return compile_schema()
+
+
+@st.cache_resource
+def load_draft_store():
+    return DraftStore()
+
+
+@st.cache_resource
+def load_state_backend():
+    return open_backend()
+
+
+def _write_lines(lines):
+    for line in lines:
+        st.write(line)
+
+
+def render_question(question):
+    _write_lines(question.before)
+    if question.widget != "computed":
+        metrics.count_widget()
+    if question.widget == "radio":
+        return st.radio(question.label, question.choices, key=question.key, horizontal=question.horizontal, index=None, help=question.help)
+    if question.widget == "multiselect":
+        return st.multiselect(question.label, question.choices, key=question.key, help=question.help)
+    if question.widget == "text_area":
+        return st.text_area(question.label, key=question.key, help=question.help)
+    if question.widget == "text_input":
+        return st.text_input(question.label, key=question.key, help=question.help)
+    # Computed columns (e.g. Timestamp) have no widget
+    return None
+
+
+def render_questions(questions):
+    state = st.session_state
+    for question in questions:
+        if question.show_if and state.get(question.show_if[0]) != question.show_if[1]:
+            continue
+        render_question(question)
+
+
+def _render_header(section):
+    _write_lines(section.before)
+    if section.title:
+        st.subheader(section.title)
+    if section.heading:
+        st.markdown(section.heading)
+    _write_lines(section.intro)
+
+
+def render_section(section):
+    _render_header(section)
+    render_questions(section.questions)
+    _write_lines(section.after)
+
+
+def render_identifiers(plan, section):
+    # Like render_section, with the catalog search between the reviewer's name and the college
+    index = current_catalog()
+    if index is None:
+        render_section(section)
+        return
+    _render_header(section)
+    render_questions(section.questions[:1])
+    render_catalog_search(plan, index)
+    render_questions(section.questions[1:])
+    _write_lines(section.after)
+
+
+@st.fragment
+def render_pslo_block(block):
+    run = metrics.begin_run("fragment")    # None when rendered as part of a full run
+    render_section(block)
+    # A fragment rerun skips the end of formapp.py, so save this block's answers here
+    keys = [question.key for question in block.questions]
+    save_draft(keys)
+    save_shared_state(keys)
+    metrics.end_run(run)
+
+
+@st.fragment
+def render_pslo_loop(plan, loop):
+    # The whole loop is a fragment as well (the blocks are fragments nested inside it): answering a
+    # "more PSLOs" question re-runs only this loop, and the new block is rendered in that same run
+    # (no extra st.rerun() cascade, no full page run).
+    run = metrics.begin_run("fragment")    # None when rendered as part of a full run
+    state = st.session_state
+    if loop.title:
+        st.subheader(loop.title)
+    _write_lines(loop.intro)
+    render_pslo_block(plan.blocks[(loop.id, 1)])
+    render_pslo_block(plan.blocks[(loop.id, 2)])
+
+    gate = render_question(loop.gate)
+    if loop.counter not in state:
+        state[loop.counter] = 2
+    if gate == "Yes" and state[loop.counter] == 2:
+        state[loop.counter] = 3
+
+    if loop.keep_open or gate == "Yes":
+        i = 3
+        while i <= state[loop.counter]:
+            render_pslo_block(plan.blocks[(loop.id, i)])
+            more = render_question(plan.more[(loop.id, i)])
+            if more == "Yes" and i == state[loop.counter] and i < MAX_PSLOS:
+                state[loop.counter] += 1
+            i += 1
+
+    _write_lines(loop.after)
+    # A loop rerun skips the end of formapp.py, so save the counter and the "more" answers here
+    keys = [loop.counter, loop.gate.key] + [plan.more[(loop.id, i)].key for i in range(3, state[loop.counter] + 1)]
+    save_draft(keys)
+    save_shared_state(keys)
+    metrics.end_run(run)
+
+
+def form_instance_id():
+    # Identifies this filled-in form; saved with the draft so a restored form keeps its identity
+    return st.session_state.setdefault("_form_instance", uuid.uuid4().hex)
+
+
+def progress_keys(plan):
+    # Everything that makes up a review in progress: widget keys, PSLO counters and the instance ID
+    return plan.state_keys + ("_form_instance",)
+
+
+def render_form(plan):
+    restore_shared_state(progress_keys(plan))
+    form_instance_id()
+    for part in plan.layout:
+        if isinstance(part, PsloLoop):
+            render_pslo_loop(plan, part)
+        elif part.id == "identifiers":
+            render_identifiers(plan, part)
+            restore_draft(part)
+        else:
+            render_section(part)
+
+
+def missing_required(plan):
+    return [q for q in plan.required if not st.session_state.get(q.key)]
+
+
+# ------------------------------------PROGRAM CATALOG----------------------------------------
+@st.cache_data
+def load_catalog(path, modified):
+    # `modified` only keys the cache, so an updated catalog file is picked up without a restart
+    return read_catalog(path)
+
+
+@st.cache_resource
+def catalog_index(path, modified):
+    programs = load_catalog(path, modified)
+    return CatalogIndex(programs) if programs else None
+
+
+def current_catalog():
+    try:
+        modified = os.path.getmtime(PROGRAM_CATALOG)
+    except OSError:
+        return None
+    return catalog_index(PROGRAM_CATALOG, modified)
+
+
+def _apply_catalog_choice(plan):
+    # on_change callback: runs before the next script run, so it may still set widget values
+    state = st.session_state
+    program = state.get("_catalog_choice")
+    if program is None:
+        return
+    state["college_name"] = program.college
+    state["program_name"] = program.program
+    if program.pslos:
+        # Never undoes PSLO answers: only loops still in their initial state are opened
+        state.update(plan.pslo_prefill(program.pslos, state))
+
+
+def render_catalog_search(plan, index):
+    query = st.text_input("Find the program in the catalog", key="_catalog_query",
+                          placeholder="Start typing a program or college name")
+    if not query:
+        return
+    matches = index.search(query)
+    if not matches:
+        st.caption("No program in the catalog matches; type the college and program names below.")
+        return
+    st.selectbox("Matching programs", matches, index=None, key="_catalog_choice", format_func=lambda p: p.label,
+                 on_change=_apply_catalog_choice, args=(plan,))
+
+
+# ------------------------------------DRAFTS-------------------------------------------------
+def restore_draft(identifiers):
+    # Once reviewer and program are entered, bring back what was saved for them. This runs right
+    # after the identifiers, before any other widget of this run exists, so no extra rerun is needed.
+    state = st.session_state
+    key = draft_key(state.get("reviewer_name"), state.get("program_name"))
+    if key is None or key in (state.get("_draft_key"), state.get("_draft_submitted")):
+        return
+    saved = load_draft_store().load(key)
+    # Values restored from the shared state backend are newer than this replica's draft. Only those
+    # keys are skipped: _state_synced also grows with every save of this session.
+    skip = {question.key for question in identifiers.questions} | state.get("_state_restored", frozenset())
+    for widget_key, value in saved.items():
+        if widget_key not in skip:
+            state[widget_key] = value
+    state["_draft_key"] = key
+    state["_draft_saved"] = saved
+    if saved:
+        st.info(f"Restored your saved draft for this program ({len(saved)} answers).")
+
+
+def save_draft(keys):
+    # Writes only the values that changed since the last save (delta records)
+    state = st.session_state
+    key = state.get("_draft_key")
+    if key is None:
+        return
+    saved = state["_draft_saved"]
+    changes = _changed(state, keys, saved)
+    if not changes:
+        return
+    start = time.perf_counter()
+    try:
+        load_draft_store().save(key, changes)
+    except Exception:
+        # Autosave must never take the form down; the changes are retried on the next run
+        logging.exception("Could not save the draft %s", key)
+        return
+    state["_draft_write_ms"] = (time.perf_counter() - start) * 1000
+    saved.update(changes)
+
+
+def _changed(state, keys, saved):
+    return {k: state[k] for k in keys if k in state and (k not in saved or saved[k] != state[k])}
+
+
+def discard_draft():
+    state = st.session_state
+    key = state.get("_draft_key")
+    if key is None:
+        return
+    load_draft_store().discard(key)
+    state["_draft_submitted"] = key
+    state["_draft_key"] = None
+
+
+# ------------------------------------SHARED STATE-------------------------------------------
+def restore_shared_state(keys):
+    # Once per session, before any widget exists: take the reviewer token from the URL (or issue a
+    # new one) and load the progress any replica saved under it
+    backend = load_state_backend()
+    state = st.session_state
+    if backend is None or "_state_token" in state:
+        return
+    token = st.query_params.get("token")
+    saved = {}
+    if valid_token(token):
+        allowed = set(keys)
+        saved = {k: v for k, v in backend.load(token).items() if k in allowed}
+        for k, value in saved.items():
+            state[k] = value
+    else:
+        token = new_token()
+        st.query_params["token"] = token
+    state["_state_token"] = token
+    state["_state_restored"] = frozenset(saved)
+    state["_state_synced"] = dict(saved)
+
+
+def save_shared_state(keys):
+    # Writes only the values that changed since the last sync
+    backend = load_state_backend()
+    state = st.session_state
+    token = state.get("_state_token")
+    if backend is None or token is None:
+        return
+    synced = state["_state_synced"]
+    changes = _changed(state, keys, synced)
+    if not changes:
+        return
+    try:
+        backend.save(token, changes)
+    except Exception:
+        # Like the draft autosave: a backend error must not break the form, the changes are retried
+        logging.exception("Could not save the shared state of token %s", token)
+        return
+    synced.update(changes)
+
+
+def discard_shared_state():
+    # After a submission the token is retired; a reload starts a fresh form under a new token
+    backend = load_state_backend()
+    state = st.session_state
+    token = state.get("_state_token")
+    if backend is None or token is None:
+        return
+    backend.discard(token)
+    state["_state_token"] = None
+    st.query_params.pop("token", None)
+
+
+# ------------------------------------METRICS------------------------------------------------
+def finish_run(plan, run):
+    # Records the full run started at the top of formapp.py; the session state is only pickled on
+    # every STATE_SIZE_EVERY-th run of a session
+    if run is None:
+        return
+    state = st.session_state
+    state["_reruns"] = state.get("_reruns", 0) + 1
+    state_bytes = None
+    if state["_reruns"] % metrics.STATE_SIZE_EVERY == 1:
+        state_bytes = metrics.state_size(state.items())
+    metrics.end_run(run, pslos=plan.visible_counts(state), state_bytes=state_bytes)
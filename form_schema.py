@@ -0,0 +1,468 @@
+# Declarative definition of the peer review form
+# Sections, questions, option sets, branching conditions and output column IDs live here as data.
+# compile_schema() expands the PSLO templates for PSLO1..PSLO28 once and computes the output column
+# order; form_renderer.py caches the compiled plan and walks it on every rerun.
+# This module has no Streamlit dependency so other entry points can reuse the same definitions.
+
+from dataclasses import dataclass, field, replace
+
+SCHEMA_VERSION = 1
+MAX_PSLOS = 28
+
+OPTION_SETS = {
+    "yes_no": ("Yes", "No"),
+    "confirm": ("Yes", "No", "Cannot Confirm"),
+    "determine": ("Yes", "No", "Cannot be determined"),
+    "additional_measures": (
+        "Each additional measure addresses all of the criteria.",
+        "Most of the additional measures address all of the criteria.",
+        "Some of the additional measures address all of the criteria.",
+        "None of the additional measures address all of the criteria.",
+    ),
+    "missing_items": (
+        "Timeline: Data Collection",
+        "Timeline: Data Analysis",
+        "Timeline: Discuss With Faculty",
+        "Person(s) Responsible: Data Collection",
+        "Person(s) Responsible: Data Analysis",
+        "Person(s) Responsible: Discuss With Faculty",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Question:
+    id: str                      # stable short ID, unique within its section or PSLO block
+    key: str                     # widget / session_state key ({i} is the PSLO number in PSLO blocks)
+    label: str
+    column: str | None = None    # output column ID, None if the answer is not exported
+    widget: str = "radio"        # radio, text_input, text_area, multiselect or computed
+    options: str | None = None   # name of an entry in OPTION_SETS
+    horizontal: bool = False
+    show_if: tuple | None = None  # (key, value): only shown when that answer is given
+    before: tuple = ()           # st.write() lines shown just before the widget
+    help: str | None = None
+    required: bool = False
+
+    @property
+    def choices(self):
+        return OPTION_SETS[self.options] if self.options else ()
+
+    @property
+    def default(self):
+        # What the answer reads as when the widget was never shown
+        if self.widget in ("text_input", "text_area"):
+            return ""
+        if self.widget == "multiselect":
+            return []
+        return None
+
+
+@dataclass(frozen=True)
+class Section:
+    id: str
+    before: tuple = ()           # st.write() lines before the title/heading
+    title: str | None = None     # st.subheader
+    heading: str | None = None   # st.markdown, used for the "### PSLO{i}" headings
+    intro: tuple = ()            # st.write() lines after the title
+    questions: tuple = ()
+    after: tuple = ()            # st.write() lines after the questions
+
+
+@dataclass(frozen=True)
+class PsloLoop:
+    # A run of per-PSLO blocks. PSLO1 and PSLO2 are always shown; PSLO3+ appear once `gate` is
+    # answered "Yes" and grow one at a time through the per-block `more` question.
+    id: str
+    counter: str                 # session_state key holding the number of PSLO blocks shown
+    blocks: dict                 # {1: Section, 2: Section, 3: Section template for PSLO3+}
+    gate: Question
+    more: Question
+    title: str | None = None
+    intro: tuple = ()
+    after: tuple = ()
+    keep_open: bool = False      # keep PSLO3+ blocks once opened, even if the gate goes back to "No"
+
+    def block_template(self, i):
+        return self.blocks[min(i, 3)]
+
+    def visible_count(self, state):
+        if self.keep_open or state.get(self.gate.key) == "Yes":
+            return max(state.get(self.counter, 2), 2)
+        return 2
+
+
+def numbering(i):
+    # Question numbers printed in the PSLO3+ Methods and Measures blocks
+    step = (i - 2) * 5
+    return {"i": i, "n21": 21 + step, "n22": 22 + step, "n23": 23 + step, "n24": 24 + step}
+
+
+# ------------------------------------TOP SECTIONS-------------------------------------------------
+IDENTIFIERS = Section(
+    id="identifiers",
+    title="Reviewer and Program Identifiers",
+    questions=(
+        Question("reviewer", "reviewer_name", "1. Reviewer's Name *", "Reviewer Name", "text_input", help="Enter your full name", required=True),
+        Question("college", "college_name", "2. Name of College (for the program) *", "College Name", "text_input", help="Enter the college's name", required=True),
+        Question("program", "program_name", "3. Program Name (as written on the plan) *", "Program Name", "text_input", help="Enter the official program name", required=True),
+    ),
+)
+
+PLAN_COMPLETION = Section(
+    id="plan_completion",
+    title="Plan Completion Rate",
+    questions=(
+        Question("program_info", "program_info_complete", "4. The table for Program Information is complete (first table). *", "Program Info Complete", options="yes_no"),
+    ),
+)
+
+YEARLY_ASSESSMENT = Section(
+    id="yearly_assessment",
+    title="Yearly Assessment Timeline and Responsibilities",
+    questions=(
+        Question("complete", "yearly_assessment_complete", "5. The Yearly Assessment Timeline and Responsibilities table is complete. *", "Yearly Assessment Complete", options="yes_no"),
+        Question("missing", "missing_items", "Select missing elements:", "Missing Items", "multiselect", options="missing_items",
+                 show_if=("yearly_assessment_complete", "No"), before=("6. If No, indicate what is missing. Choose all that apply.",)),
+        Question("timestamp", "timestamp", "", "Timestamp", "computed"),
+    ),
+)
+
+CURRICULUM_MAP = Section(
+    id="curriculum_map",
+    title="Curriculum Map Review",
+    intro=("7. Review the Curriculum Map in the assessment plan and indicate whether each of the following components are present.",),
+    questions=tuple(
+        Question(f"c{n}", f"curriculum_map_q{n}", f"{column}.", column, options="confirm", horizontal=True)
+        for n, column in enumerate([
+            "All PSLOs are listed",
+            "All core/required program courses are listed",
+            "The map contains indicators for which courses address a PSLO (X or I, R)",
+            "The map indicates where each PSLO is assessed (A)",
+            "The Assessment Schedule is indicated for each PSLO",
+            "At least one assessment instrument is listed for each PSLO",
+        ], start=1)
+    ),
+)
+
+
+# ------------------------------------PSLO QUALITY-------------------------------------------------
+def _quality_block(labels, before=()):
+    return Section(
+        id="pslo_quality",
+        before=before,
+        heading="### PSLO{i}",
+        questions=tuple(
+            Question(f"q{q}", f"pslo{{i}}_q{q}", label, f"PSLO{{i}} Quality {q}", options="confirm")
+            for q, label in enumerate(labels, start=1)
+        ),
+    )
+
+
+QUALITY_LABELS_PSLO1_2 = (
+    "The PSLO is appropriate for the degree program level (undergraduate or graduate).",
+    "The PSLO clearly describes expected student performance or competencies.",
+    "The PSLO uses precise learning verbs (e.g., Bloom's/Marzano’s).",
+    "The PSLO includes verbs at different cognitive levels.",
+    "The PSLO clearly specifies knowledge, skills, and/or abilities.",
+)
+
+QUALITY_LABELS_PSLO3_PLUS = (
+    "The PSLO is appropriate for the degree program level (undergraduate or graduate).",
+    "The PSLO uses precise learning verbs (e.g., verbs from frameworks like Bloom’s or Marzano’s taxonomies).",
+    "The PSLO contains/lists multiple learning verbs at different levels of cognition.",
+    "The knowledge, skills and/or abilities are clearly specified in the PSLO.",
+    "The PSLO contains/lists multiple knowledge, skills and/or abilities students will attain.",
+)
+
+PSLO_QUALITY = PsloLoop(
+    id="pslo_quality",
+    title="PSLO Quality Review",
+    counter="num_pslos",
+    blocks={
+        1: _quality_block(QUALITY_LABELS_PSLO1_2),
+        2: _quality_block(QUALITY_LABELS_PSLO1_2, before=("",)),
+        3: _quality_block(QUALITY_LABELS_PSLO3_PLUS, before=("",)),
+    },
+    gate=Question("more", "more_pslo_2", "Are there more PSLOs to evaluate after PSLO2?", options="yes_no", horizontal=True),
+    more=Question("more", "more_pslo_{i}", "Are there more PSLOs to evaluate after PSLO{i}?", options="yes_no", horizontal=True),
+    after=("", "", "", ""),
+    keep_open=True,
+)
+
+
+# ------------------------------------METHODS AND MEASURES-------------------------------------------------
+MM_CRITERIA_PSLO1_2 = (
+    ("Direct Measure Exists", "There is at least one direct measure."),
+    ("Instrument/Tool Stated", "For the first direct measure, the assessment instrument/tools is stated and if applicable, relevant items are listed."),
+    ("Precision of Measure", "The first direct measure precisely and reliably targets the knowledge, skills and/or ability being assessed."),
+    ("Alignment Explanation", "Explanation of how the assessment aligns with the PSLO is clear."),
+    ("Course Matches Curriculum Map", "Does the course stated in the explanation match the one in the curriculum map indicated by an 'A' for the PSLO?"),
+    ("Semester Stated", "Does the explanation state the semester(s) in which the assessment is administered during the assessment cycle?"),
+    ("Sample Identified", "Is the sample (who will be assessed) clearly identified?"),
+    ("Reporting Description", "Is the description of how the results will be reported appropriate for the collected data and the measure?"),
+)
+
+MM_CRITERIA_PSLO3_PLUS = (
+    ("There is at least one direct measure", "There is at least one direct measure."),
+    ("The assessment instrument/tools are stated", "For the first direct measure, the assessment instrument/tools is stated and if applicable, relevant items are listed."),
+    ("The first direct measure is precise", "The first direct measure precisely and reliably targets the knowledge, skills and/or ability being assessed (i.e., is it granular)."),
+    ("The explanation aligns assessment with PSLO", "For the first direct measure, the explanation of how the assessment aligns with the PSLO is clear."),
+    ("The course stated in explanation matches curriculum map", "Does the course stated in the explanation match the one in the curriculum map indicated by an 'A' for the PSLO?"),
+    ("The semester of assessment is stated", "Does the explanation state the semester(s) in which the assessment is administered during the assessment cycle?"),
+    ("The sample (who will be assessed) is identified", "Is the sample (who will be assessed) clearly identified?"),
+    ("Description of reporting results is appropriate", "Is the description of how the results will be reported appropriate for the collected data and the measure?"),
+)
+
+
+def _mm_criteria(criteria, key, column):
+    return tuple(
+        Question(f"m{q}", key.format(q=q), label, column.format(name=name), options="confirm", horizontal=True)
+        for q, (name, label) in enumerate(criteria, start=1)
+    )
+
+
+MM_PSLO1 = Section(
+    id="methods_measures",
+    title="Methods and Measures for PSLO1",
+    intro=("PSLO 1: Assess the method and measures.",),
+    questions=_mm_criteria(MM_CRITERIA_PSLO1_2[:4], "m1_q{q}", "PSLO1 - {name}") + (
+        Question("additional", "additional_measures_pslo1", "Are there additional measures listed for PSLO1?", "PSLO1 - Additional Measures", options="yes_no", horizontal=True),
+        Question("assessment", "measure_assessment_pslo1", "Collectively assess the extent to which all the additional measures provide the following criteria.", "PSLO1 - Measure Assessment",
+                 options="additional_measures", horizontal=True, show_if=("additional_measures_pslo1", "Yes")),
+        Question("feedback", "feedback_pslo1", "Provide your feedback(e.g., what was done well, what could be improved, etc.) on PSLO1.", "PSLO1 - Feedback", "text_area"),
+    ),
+)
+
+MM_PSLO2 = Section(
+    id="methods_measures",
+    title="Methods and Measures for PSLO2",
+    intro=("PSLO 2: Assess the method and measures.",),
+    questions=_mm_criteria(MM_CRITERIA_PSLO1_2, "m2_q{q}", "PSLO2 - {name}") + (
+        Question("additional", "additional_measures_pslo2", "Are there additional measures listed for PSLO2?", "PSLO2 - Additional Measures", options="yes_no", horizontal=True),
+        Question("assessment", "measure_assessment_pslo2", "Collectively assess the extent to which all the additional measures provide the following:", "PSLO2 - Measure Assessment",
+                 options="additional_measures", horizontal=True, show_if=("additional_measures_pslo2", "Yes")),
+        Question("feedback", "feedback_pslo2", "Provide your feedback on PSLO2.", "PSLO2 - Feedback", "text_area",
+                 before=("", "Provide your feedback (e.g., what was done well, what could be improved, etc.) on PSLO2.")),
+    ),
+)
+
+MM_PSLO3_PLUS = Section(
+    id="methods_measures",
+    title="Methods and Measures for PSLO{i}",
+    intro=("{n21}. PSLO {i}: Assess the method and measures.",),
+    questions=tuple(
+        replace(q, options="determine")
+        for q in _mm_criteria(MM_CRITERIA_PSLO3_PLUS, "mm_pslo{{i}}_q{q}", "{name} (PSLO{{i}})")
+    ) + (
+        Question("additional", "additional_measures_pslo{i}", "", "PSLO{i} - Additional Measures", options="yes_no", horizontal=True,
+                 before=("{n22}. Are there additional measures listed for PSLO{i}?",)),
+        Question("assessment", "measure_assessment_pslo{i}", "", "PSLO{i} - Measure Assessment", options="additional_measures", horizontal=True,
+                 show_if=("additional_measures_pslo{i}", "Yes"),
+                 before=(
+                     "",
+                     "{n23}. Collectively assess the extent to which all the additional measures provide the following:",
+                     "a) Is listed in the curriculum map",
+                     "b) Whether it is direct or indirect",
+                     "c) Instrument/tool and items (if applicable) identified",
+                     "d) Provides a clear explanation of how the assessment aligns with the PSLO",
+                     "e) Describes how the results will be reported",
+                 )),
+        Question("feedback", "feedback_pslo{i}", "", "PSLO{i} - Feedback", "text_area",
+                 before=("", "{n23}. Provide your feedback (e.g., what was done well, what could be improved, etc.) on PSLO{i}.")),
+    ),
+    after=("",),
+)
+
+METHODS_MEASURES = PsloLoop(
+    id="methods_measures",
+    title="METHODS AND MEASURES",
+    intro=("",),
+    counter="num_pslos_mm",
+    blocks={1: MM_PSLO1, 2: MM_PSLO2, 3: MM_PSLO3_PLUS},
+    gate=Question("more", "another_pslo_pslo2", "", options="yes_no", horizontal=True,
+                  before=("", "Is there another PSLO to assess in the assessment plan?")),
+    more=Question("more", "another_pslo_mm_{i}", "{n24}. Is there another PSLO to assess in the assessment plan?", "PSLO{i} - Another PSLO After",
+                  options="yes_no", horizontal=True),
+    after=("", "", ""),
+)
+
+
+# ------------------------------------CLOSING SECTIONS-------------------------------------------------
+STUDENT_SUCCESS = Section(
+    id="student_success",
+    title="Student Success Assessment: Methods and Measures",
+    intro=("", ""),
+    questions=(
+        Question("outcome", "student_success_outcome", "The assessment plan identifies at least one student success outcome (e.g. retention, progression, graduation).",
+                 "Student Success - Outcome Identified", options="yes_no", horizontal=True),
+        Question("measure", "student_success_measure", "For at least one student success outcome, a measure is provided.",
+                 "Student Success - Measure Provided", options="yes_no", horizontal=True),
+    ),
+)
+
+APPENDIX = Section(
+    id="appendix",
+    title="Appendix",
+    intro=("", ""),
+    questions=(
+        Question("toc", "appendix_table_of_contents", "The appendix contains a Table of Contents.", "Appendix - Table of Contents", options="yes_no", horizontal=True),
+        Question("descriptions", "appendix_pslo_description", "For each PSLO, is a copy or detailed description of the instrument/tool included?",
+                 "Appendix - PSLO Descriptions Included", options="yes_no", horizontal=True),
+        Question("missing", "appendix_missing_details", "For missing copies or descriptions, list the PSLO number and name of the missing instrument/tool or write 'mismatch'.",
+                 "Appendix - Missing Details", "text_area", show_if=("appendix_pslo_description", "No"), before=("",)),
+    ),
+)
+
+ESTIMATED_DURATION = Section(
+    id="estimated_duration",
+    title="Estimated Duration",
+    questions=(
+        Question("minutes", "estimated_duration", "Approximately how many minutes did you spend reviewing the assessment plan?", "Estimated Duration (Minutes)", "text_input"),
+    ),
+)
+
+FORM_LAYOUT = (
+    IDENTIFIERS,
+    PLAN_COMPLETION,
+    YEARLY_ASSESSMENT,
+    CURRICULUM_MAP,
+    PSLO_QUALITY,
+    METHODS_MEASURES,
+    STUDENT_SUCCESS,
+    APPENDIX,
+    ESTIMATED_DURATION,
+)
+
+
+# ------------------------------------COMPILED PLAN-------------------------------------------------
+@dataclass(frozen=True)
+class Column:
+    name: str
+    question: Question
+    section: str                 # Section.id or PsloLoop.id the question belongs to
+    loop: str | None = None      # PsloLoop.id for per-PSLO columns
+    pslo: int | None = None
+
+    def value(self, state, computed=None):
+        q = self.question
+        if q.widget == "computed":
+            return (computed or {}).get(self.name)
+        if q.show_if and state.get(q.show_if[0]) != q.show_if[1]:
+            value = [] if q.widget == "multiselect" else ""
+        else:
+            value = state.get(q.key, q.default)
+        if q.widget == "multiselect":
+            return ", ".join(value) if value else "None"
+        return value
+
+
+@dataclass(frozen=True)
+class Plan:
+    version: int
+    layout: tuple
+    blocks: dict                 # {(loop id, i): Section} with every template expanded
+    more: dict                   # {(loop id, i): Question} for PSLO3+
+    columns: tuple               # every output column, in submission order
+    questions: dict = field(default_factory=dict)  # widget key -> Question
+    state_keys: tuple = ()       # every session_state key that holds form progress
+
+    @property
+    def required(self):
+        return tuple(q for q in self.questions.values() if q.required)
+
+    def visible_counts(self, state):
+        return {loop.id: loop.visible_count(state) for loop in self.layout if isinstance(loop, PsloLoop)}
+
+    def pslo_prefill(self, count, state=None):
+        # Answers that open exactly `count` PSLO blocks in every loop, so the form renders them all
+        # in one run (used when a program is picked from the catalog). Loops the reviewer already
+        # worked on (gate answered or counter past 2) in `state` are left alone.
+        count = min(max(count, 2), MAX_PSLOS)
+        state = state or {}
+        values = {}
+        for loop in self.layout:
+            if not isinstance(loop, PsloLoop):
+                continue
+            if state.get(loop.gate.key) is not None or state.get(loop.counter, 2) != 2:
+                continue
+            values[loop.counter] = count
+            values[loop.gate.key] = "Yes" if count > 2 else "No"
+            for i in range(3, count + 1):
+                values[self.more[(loop.id, i)].key] = "Yes" if i < count else "No"
+        return values
+
+    def collect(self, state, computed=None):
+        counts = self.visible_counts(state)
+        answers = {}
+        for column in self.columns:
+            if column.loop is not None and column.pslo > counts[column.loop]:
+                continue
+            answers[column.name] = column.value(state, computed)
+        return answers
+
+
+def _expand_text(text, fmt):
+    return text.format(**fmt) if text else text
+
+
+def _expand_question(question, fmt):
+    return replace(
+        question,
+        key=question.key.format(**fmt),
+        label=_expand_text(question.label, fmt),
+        column=_expand_text(question.column, fmt),
+        show_if=(question.show_if[0].format(**fmt), question.show_if[1]) if question.show_if else None,
+        before=tuple(_expand_text(line, fmt) for line in question.before),
+    )
+
+
+def _expand_section(section, fmt):
+    return replace(
+        section,
+        before=tuple(_expand_text(line, fmt) for line in section.before),
+        title=_expand_text(section.title, fmt),
+        heading=_expand_text(section.heading, fmt),
+        intro=tuple(_expand_text(line, fmt) for line in section.intro),
+        questions=tuple(_expand_question(q, fmt) for q in section.questions),
+        after=tuple(_expand_text(line, fmt) for line in section.after),
+    )
+
+
+def expand_block(loop, fmt):
+    # A PSLO3+ block and its "more" question with fmt filled into the templates; static_form.py passes
+    # placeholders that the browser fills in for each PSLO it adds
+    return _expand_section(loop.block_template(3), fmt), _expand_question(loop.more, fmt)
+
+
+def compile_schema(layout=FORM_LAYOUT, max_pslos=MAX_PSLOS):
+    blocks = {}
+    more = {}
+    questions = {}
+    columns = []
+
+    for part in layout:
+        if isinstance(part, Section):
+            for q in part.questions:
+                questions[q.key] = q
+                if q.column:
+                    columns.append(Column(q.column, q, part.id))
+            continue
+
+        questions[part.gate.key] = part.gate
+        for i in range(1, max_pslos + 1):
+            fmt = numbering(i)
+            block = _expand_section(part.block_template(i), fmt)
+            blocks[(part.id, i)] = block
+            block_questions = list(block.questions)
+            if i >= 3:
+                more[(part.id, i)] = _expand_question(part.more, fmt)
+                block_questions.append(more[(part.id, i)])
+            for q in block_questions:
+                questions[q.key] = q
+                if q.column:
+                    columns.append(Column(q.column, q, part.id, part.id, i))
+
+    counters = tuple(part.counter for part in layout if isinstance(part, PsloLoop))
+    state_keys = tuple(key for key, q in questions.items() if q.widget != "computed") + counters
+    return Plan(SCHEMA_VERSION, tuple(layout), blocks, more, tuple(columns), questions, state_keys)
@@ -0,0 +1,219 @@
+# In-process instrumentation of reruns and submissions
+# Rolling histograms of:
+#   - every script rerun: wall time, widgets rendered, PSLO blocks shown and session-state size, for
+#     full runs of formapp.py and for single PSLO block (st.fragment) runs
+#   - reruns a reviewer session took before pressing Submit
+#   - submissions: the outbox write when Submit is pressed (created / duplicate / error), each
+#     delivery request to Power Automate and the press-to-acknowledgement time (from delivery.py)
+# Each histogram keeps cumulative bucket counts (Prometheus style) plus the last WINDOW samples for
+# percentiles. Recording a rerun costs a few perf_counter() calls, one counter bump per widget and
+# deque appends; session state is only measured on every STATE_SIZE_EVERY-th rerun of a session.
+# Exposed three ways:
+#   - METRICS_PORT=9464              Prometheus text format at http://127.0.0.1:9464/metrics
+#                                    (METRICS_HOST=0.0.0.0 exposes it to other hosts)
+#   - METRICS_FILE=form_metrics.jsonl  one JSON line per rerun, submission and delivery request
+#   - the "Rerun metrics" panel of the admin sidebar in formapp.py (?admin=1, needs ADMIN_PASSWORD)
+# METRICS_ENABLED=0 turns recording off.
+
+import json
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+WINDOW = 1000            # recent samples kept per series for percentiles
+STATE_SIZE_EVERY = 10    # pickling the session state is the only costly measurement, so sample it
+
+_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+_WIDGETS = (10, 25, 50, 100, 150, 200, 300, 400, 600, 800)
+_PSLOS = (2, 3, 4, 6, 8, 12, 16, 20, 28)
+_BYTES = (1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 1e6)
+_RERUNS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# name -> (description, buckets)
+HISTOGRAMS = {
+    "form_rerun_seconds": ("Wall time of one script run", _SECONDS),
+    "form_rerun_widgets": ("Widgets rendered in one script run", _WIDGETS),
+    "form_rerun_pslos": ("PSLO blocks shown per loop in one full run", _PSLOS),
+    "form_session_state_bytes": ("Pickled size of the session state (sampled)", _BYTES),
+    "form_session_reruns": ("Full reruns of a session before Submit was pressed", _RERUNS),
+    "form_submit_seconds": ("Time to record a submission in the outbox", _SECONDS),
+    "delivery_request_seconds": ("Duration of one request to the Power Automate flow", _SECONDS),
+    "delivery_end_to_end_seconds": ("From Submit to the flow acknowledging the record", _SECONDS),
+}
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "sum", "recent")
+
+    def __init__(self, size):
+        self.buckets = [0] * (size + 1)    # per bucket, last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+
+class Registry:
+    def __init__(self, histograms=HISTOGRAMS):
+        self.histograms = histograms
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in histograms}    # name -> {labels: _Series}
+
+    def observe(self, name, value, **labels):
+        buckets = self.histograms[name][1]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name].get(key)
+            if series is None:
+                series = self._series[name][key] = _Series(len(buckets))
+            series.buckets[bisect_left(buckets, value)] += 1
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+
+    def summary(self):
+        # {name: {"kind=full": {"count": ..., "p50": ..., "p95": ..., "max": ...}}}
+        with self._lock:
+            snapshot = {
+                name: {labels: (series.count, sorted(series.recent)) for labels, series in by_labels.items()}
+                for name, by_labels in self._series.items()
+            }
+        summary = {}
+        for name, by_labels in snapshot.items():
+            for labels, (count, recent) in sorted(by_labels.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels) or "all"
+                summary.setdefault(name, {})[label] = {
+                    "count": count,
+                    "p50": round(recent[len(recent) // 2], 4),
+                    "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 4),
+                    "max": round(recent[-1], 4),
+                }
+        return summary
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            for name, (description, buckets) in self.histograms.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, series in sorted(self._series[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float("inf"),), series.buckets):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {series.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {series.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+REGISTRY = Registry()
+_file_lock = threading.Lock()
+
+
+def observe(name, value, **labels):
+    if METRICS_ENABLED:
+        REGISTRY.observe(name, value, **labels)
+
+
+def record(event, **fields):
+    # One JSON line per event in METRICS_FILE, when set
+    if not (METRICS_ENABLED and METRICS_FILE):
+        return
+    line = json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, separators=(",", ":"))
+    with _file_lock, open(METRICS_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def summary():
+    return REGISTRY.summary()
+
+
+# ------------------------------------RERUNS-------------------------------------------------
+# Streamlit executes a script run on one thread, so the current run is tracked per thread
+_local = threading.local()
+
+
+class _Run:
+    __slots__ = ("kind", "started", "widgets")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.widgets = 0
+
+
+def begin_run(kind="full"):
+    # A full run always starts a new measurement; a fragment rendered inside a full run is part of it
+    if not METRICS_ENABLED:
+        return None
+    if kind != "full" and getattr(_local, "run", None) is not None:
+        return None
+    _local.run = _Run(kind)
+    return _local.run
+
+
+def count_widget():
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run.widgets += 1
+
+
+def end_run(run, pslos=None, state_bytes=None):
+    if run is None:
+        return
+    _local.run = None
+    seconds = time.perf_counter() - run.started
+    observe("form_rerun_seconds", seconds, kind=run.kind)
+    observe("form_rerun_widgets", run.widgets, kind=run.kind)
+    for loop, count in (pslos or {}).items():
+        observe("form_rerun_pslos", count, loop=loop)
+    if state_bytes is not None:
+        observe("form_session_state_bytes", state_bytes)
+    record("rerun", kind=run.kind, seconds=round(seconds, 6), widgets=run.widgets, pslos=pslos, state_bytes=state_bytes)
+
+
+def state_size(items):
+    # Pickled size of the session state values; None when something in it can't be pickled
+    try:
+        return len(pickle.dumps(dict(items), protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+
+# ------------------------------------ENDPOINT-----------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        data = REGISTRY.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(port=METRICS_PORT, host=METRICS_HOST):
+    # Prometheus scrape endpoint on its own port (Streamlit can't add routes to its own server)
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return server
@@ -0,0 +1,235 @@
+# Local columnar store of every submitted review
+# Submitting only appends one JSON line to this process's append log (reviewer_responses/_log/), a
+# millisecond-scale write. A background flusher thread (start_flusher) moves the logged rows into
+# Parquet every FLUSH_SECONDS, one part file per month partition per flush
+# (reviewer_responses/month=2025-04/part-....parquet), with a fixed schema derived from the form:
+# two metadata columns plus every output column of the compiled plan (PSLO1..PSLO28), all strings.
+# The same thread compacts a partition once it collects enough parts; neither the flush nor the
+# compaction ever runs inside a reviewer's request. Readers see rows once they are flushed; logs left
+# by a process that exited are taken over by the next flush of any process (the admin dashboard
+# flushes on every run). Admins can load tens of thousands of reviews with pandas in seconds and
+# read only the columns they need:
+#
+#     ResponseStore().load(columns=["College Name", "PSLO1 Quality 1"])
+#
+# Needs pandas with pyarrow.
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from form_schema import compile_schema
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_STORE_DIR = os.environ.get("RESPONSE_STORE_DIR", "reviewer_responses")
+FLUSH_SECONDS = 30           # how often the flusher moves logged rows into Parquet
+COMPACT_AFTER_PARTS = 50     # part files in one partition before they are merged
+LOCK_STALE_SECONDS = 300
+LOG_DIR = "_log"
+
+META_COLUMNS = ["submission_id", "submitted_at"]
+
+# Appends to this process's log, flushes (one at a time) and one flusher thread per store directory
+_log_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flushers = {}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ResponseStore:
+    def __init__(self, root=RESPONSE_STORE_DIR, plan=None):
+        self.root = root
+        self.plan = plan or compile_schema()
+        self.answer_columns = [column.name for column in self.plan.columns]
+        self.columns = META_COLUMNS + self.answer_columns
+        os.makedirs(os.path.join(root, LOG_DIR), exist_ok=True)
+
+    # ------------------------------------WRITE-------------------------------------------------
+    def _frame(self, rows):
+        frame = pd.DataFrame(rows, columns=self.columns)
+        frame[self.answer_columns] = frame[self.answer_columns].astype("string")
+        frame["submission_id"] = frame["submission_id"].astype("string")
+        frame["submitted_at"] = pd.to_datetime(frame["submitted_at"])
+        return frame
+
+    def _write(self, frame, directory, name):
+        # Readers skip dot-files, so a part only becomes visible once it is complete
+        tmp = os.path.join(directory, f".{name}.tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(directory, name))
+
+    def append(self, form_data, submission_id=None, submitted_at=None):
+        # One JSON line in this process's log; unanswered columns are left out
+        submitted_at = submitted_at or datetime.now()
+        row = {column: form_data[column] for column in self.answer_columns if form_data.get(column) is not None}
+        row["submission_id"] = submission_id or uuid.uuid4().hex
+        row["submitted_at"] = submitted_at.isoformat()
+        line = json.dumps(row, separators=(",", ":"), ensure_ascii=False)
+        with _log_lock, open(self._log_path(os.getpid()), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return row["submission_id"]
+
+    # ------------------------------------FLUSH-------------------------------------------------
+    def _log_path(self, pid, sealed=None):
+        directory = os.path.join(self.root, LOG_DIR)
+        if sealed is None:
+            return os.path.join(directory, f"log-{pid}.jsonl")
+        return os.path.join(directory, f"sealed-{pid}-{sealed}.jsonl")
+
+    def _seal_logs(self):
+        # Claims the logs to flush by renaming them to sealed-<this pid>-...: this process's own log
+        # (under the append lock) and every log or sealed file left behind by a process that exited.
+        # A rename is atomic, so when two processes race for an orphaned file only one of them gets it.
+        directory = os.path.join(self.root, LOG_DIR)
+        own = os.getpid()
+        for name in os.listdir(directory):
+            if not name.startswith(("log-", "sealed-")):
+                continue
+            pid = int(name.split("-")[1].split(".")[0])
+            sealed = self._log_path(own, f"{time.time_ns()}-{uuid.uuid4().hex[:8]}")
+            if pid == own:
+                if name.startswith("log-"):
+                    with _log_lock:
+                        os.replace(os.path.join(directory, name), sealed)
+            elif not _pid_alive(pid):
+                try:
+                    os.replace(os.path.join(directory, name), sealed)
+                except FileNotFoundError:
+                    pass
+        prefix = f"sealed-{own}-"
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix))
+
+    def flush(self):
+        # Moves every sealed log into Parquet, one part per month partition; returns the row count
+        with _flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        sealed = self._seal_logs()
+        rows = []
+        for path in sealed:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        # A process killed mid-write leaves a partial last line
+                        logger.warning("Skipping an unreadable line in %s", path)
+        if rows:
+            frame = self._frame(rows)
+            for month, part in frame.groupby(frame["submitted_at"].dt.strftime("%Y-%m")):
+                partition = os.path.join(self.root, f"month={month}")
+                os.makedirs(partition, exist_ok=True)
+                self._write(part, partition, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        for path in sealed:
+            os.remove(path)
+        return len(rows)
+
+    def flush_and_compact(self):
+        rows = self.flush()
+        for partition in self.partitions():
+            if len(self._parts(partition)) >= COMPACT_AFTER_PARTS:
+                self.compact(partition)
+        return rows
+
+    def start_flusher(self, interval=FLUSH_SECONDS):
+        # Background thread that flushes and compacts; started once per process and store directory
+        with _log_lock:
+            thread = _flushers.get(self.root)
+            if thread is not None and thread.is_alive():
+                return thread
+            thread = threading.Thread(target=self._flush_forever, args=(interval,), name="response-store-flusher", daemon=True)
+            _flushers[self.root] = thread
+        thread.start()
+        return thread
+
+    def _flush_forever(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush_and_compact()
+            except Exception:
+                logger.exception("Flushing the response store failed")
+
+    def _parts(self, partition):
+        return sorted(name for name in os.listdir(partition) if name.startswith("part-") and name.endswith(".parquet"))
+
+    def compact(self, partition):
+        # Merge the partition's part files into one; skipped while another process holds the lock
+        lock = os.path.join(partition, ".compact.lock")
+        try:
+            if time.time() - os.path.getmtime(lock) > LOCK_STALE_SECONDS:
+                os.remove(lock)
+        except OSError:
+            pass
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        try:
+            parts = self._parts(partition)
+            if len(parts) < 2:
+                return False
+            frame = pd.concat([pd.read_parquet(os.path.join(partition, name)) for name in parts], ignore_index=True)
+            # A flush interrupted after writing its part but before removing its log is replayed
+            frame = frame.drop_duplicates("submission_id", keep="first")
+            # "part-<ns>" keeps the merged file sorted before parts appended after it
+            self._write(self._frame(frame[self.columns]), partition, f"{parts[-1][:-len('.parquet')]}-merged.parquet")
+            for name in parts:
+                os.remove(os.path.join(partition, name))
+            return True
+        finally:
+            os.close(fd)
+            os.remove(lock)
+
+    def compact_all(self):
+        for partition in self.partitions():
+            self.compact(partition)
+
+    # ------------------------------------READ-------------------------------------------------
+    def partitions(self):
+        return sorted(
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name.startswith("month=") and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def version(self):
+        # Changes whenever logged submissions are flushed or a partition compacted; used to invalidate caches
+        parts = self.files()
+        return len(parts), max((os.path.getmtime(path) for path in parts), default=0.0)
+
+    def files(self, months=None):
+        partitions = self.partitions()
+        if months is not None:
+            partitions = [p for p in partitions if os.path.basename(p)[len("month="):] in set(months)]
+        return [os.path.join(partition, name) for partition in partitions for name in self._parts(partition)]
+
+    def load(self, columns=None, months=None):
+        columns = list(columns) if columns is not None else self.columns
+        files = self.files(months)
+        if not files:
+            return self._frame([])[columns]
+        return pq.ParquetDataset(files).read(columns=columns).to_pandas()
+
+    def iter_batches(self, columns=None, batch_size=1000, months=None):
+        # DataFrames of at most batch_size reviews, for work that must not hold the whole store in memory
+        for path in self.files(months):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pandas()
@@ -0,0 +1,145 @@
+# Rubric scoring over stored reviews
+# Works on the DataFrame loaded from response_store.py. Every computation is a vectorized
+# pandas/NumPy operation over whole columns (no per-review Python loops):
+#   - rubric_scores: Yes / No / Cannot Confirm rates per rubric area, grouped by program or college
+#   - reviewer_agreement: percent agreement and Cohen's kappa when two reviewers scored a program
+#   - duration_stats: reviewer time spent, from "Estimated Duration (Minutes)"
+
+import numpy as np
+import pandas as pd
+
+COLLEGE = "College Name"
+PROGRAM = "Program Name"
+REVIEWER = "Reviewer Name"
+DURATION = "Estimated Duration (Minutes)"
+
+# Rubric areas and the question IDs scored in each (branching questions are not scored)
+RUBRIC_AREAS = {
+    "Curriculum map": ("curriculum_map", None),
+    "PSLO quality": ("pslo_quality", {"q1", "q2", "q3", "q4", "q5"}),
+    "Methods & measures": ("methods_measures", {f"m{n}" for n in range(1, 9)}),
+    "Student success": ("student_success", None),
+    "Appendix": ("appendix", {"toc", "descriptions"}),
+}
+
+YES = "Yes"
+NO = "No"
+CANNOT = ("Cannot Confirm", "Cannot be determined")
+
+
+def rubric_columns(plan):
+    areas = {}
+    for area, (section, ids) in RUBRIC_AREAS.items():
+        areas[area] = [
+            column.name for column in plan.columns
+            if column.section == section and column.question.widget == "radio" and (ids is None or column.question.id in ids)
+        ]
+    return areas
+
+
+def _present(frame, columns):
+    return [column for column in columns if column in frame.columns]
+
+
+def _values(frame, columns):
+    # Missing answers as None, so elementwise comparisons stay plain booleans
+    return frame[_present(frame, columns)].to_numpy(dtype=object, na_value=None)
+
+
+def _normalize(names):
+    return names.fillna("").astype(str).str.strip().str.casefold().str.replace(r"\s+", " ", regex=True)
+
+
+def answer_counts(frame, areas):
+    # One row per review: number of Yes / No / Cannot answers in every rubric area
+    counts = {}
+    for area, columns in areas.items():
+        values = _values(frame, columns)
+        counts[f"{area}|yes"] = (values == YES).sum(axis=1)
+        counts[f"{area}|no"] = (values == NO).sum(axis=1)
+        counts[f"{area}|cannot"] = np.isin(values, CANNOT).sum(axis=1)
+    return pd.DataFrame(counts, index=frame.index)
+
+
+def rubric_scores(frame, areas, by="program"):
+    keys = ["_college", "_program"] if by == "program" else ["_college"]
+    counts = answer_counts(frame, areas)
+    count_columns = list(counts.columns)
+    counts["_college"] = _normalize(frame[COLLEGE])
+    counts["_program"] = _normalize(frame[PROGRAM])
+    counts[COLLEGE] = frame[COLLEGE]
+    counts[PROGRAM] = frame[PROGRAM]
+
+    grouped = counts.groupby(keys)
+    totals = grouped[count_columns].sum()
+    labels = grouped[[COLLEGE, PROGRAM]].first()
+
+    result = pd.DataFrame({"College": labels[COLLEGE]})
+    if by == "program":
+        result["Program"] = labels[PROGRAM]
+    result["Reviews"] = grouped.size()
+    for area in areas:
+        yes, no, cannot = totals[f"{area}|yes"], totals[f"{area}|no"], totals[f"{area}|cannot"]
+        answered = (yes + no + cannot).replace(0, np.nan)
+        result[f"{area}: Yes %"] = (100 * yes / answered).round(1)
+        result[f"{area}: No %"] = (100 * no / answered).round(1)
+        result[f"{area}: Cannot %"] = (100 * cannot / answered).round(1)
+    return result.reset_index(drop=True)
+
+
+def reviewer_agreement(frame, areas):
+    # Programs scored by at least two different reviewers: compares the latest review of the first
+    # two reviewers on every rubric item both of them answered
+    items = _present(frame, [column for columns in areas.values() for column in columns])
+    data = frame.assign(
+        _program=_normalize(frame[COLLEGE]) + "|" + _normalize(frame[PROGRAM]),
+        _reviewer=_normalize(frame[REVIEWER]),
+    )
+    if "submitted_at" in data.columns:
+        data = data.sort_values("submitted_at")
+    latest = data.drop_duplicates(["_program", "_reviewer"], keep="last")
+    latest = latest.assign(_rank=latest.groupby("_program").cumcount())
+    second = latest[latest["_rank"] == 1].set_index("_program")
+    if second.empty:
+        return pd.DataFrame(columns=["College", "Program", "Reviewer A", "Reviewer B", "Items compared", "Agreement %", "Cohen's kappa"])
+    first = latest[latest["_rank"] == 0].set_index("_program").loc[second.index]
+
+    a = _values(first, items)
+    b = _values(second, items)
+    both = np.isin(a, (None, ""), invert=True) & np.isin(b, (None, ""), invert=True)
+    compared = both.sum(axis=1)
+    n = np.where(compared == 0, np.nan, compared)
+    observed = ((a == b) & both).sum(axis=1) / n
+
+    # Chance agreement from each reviewer's own answer distribution over the compared items
+    expected = np.zeros(len(first))
+    for category in (YES, NO) + CANNOT:
+        expected += (((a == category) & both).sum(axis=1) / n) * (((b == category) & both).sum(axis=1) / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kappa = np.where(expected < 1, (observed - expected) / (1 - expected), np.nan)
+
+    return pd.DataFrame({
+        "College": first[COLLEGE].to_numpy(),
+        "Program": first[PROGRAM].to_numpy(),
+        "Reviewer A": first[REVIEWER].to_numpy(),
+        "Reviewer B": second[REVIEWER].to_numpy(),
+        "Items compared": compared,
+        "Agreement %": np.round(100 * observed, 1),
+        "Cohen's kappa": np.round(kappa, 2),
+    }).sort_values(["College", "Program"]).reset_index(drop=True)
+
+
+def duration_stats(frame):
+    minutes = pd.to_numeric(frame[DURATION].astype(str).str.extract(r"(\d+(?:\.\d+)?)")[0], errors="coerce")
+    data = pd.DataFrame({"Reviewer": frame[REVIEWER], "_reviewer": _normalize(frame[REVIEWER]), "minutes": minutes})
+    per_reviewer = data.groupby("_reviewer").agg(
+        Reviewer=("Reviewer", "first"),
+        Reviews=("minutes", "size"),
+        Reported=("minutes", "count"),
+        Median=("minutes", "median"),
+        Mean=("minutes", "mean"),
+        Min=("minutes", "min"),
+        Max=("minutes", "max"),
+    )
+    overall = minutes.describe(percentiles=[0.5, 0.9]).rename(index={"50%": "median", "90%": "p90"})
+    return per_reviewer.reset_index(drop=True).round(1), overall.round(1)
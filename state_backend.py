@@ -0,0 +1,136 @@
+# Shared session-state backend for running several Streamlit replicas
+# st.session_state lives in one process, so without this a reviewer is pinned to the replica that
+# served their first page load. With SESSION_STATE_BACKEND set, the form's progress (every widget key
+# of the plan, the PSLO counters and the form instance ID) is mirrored to a shared store keyed by a
+# reviewer token carried in the URL (?token=...). Any replica behind the load balancer can then pick
+# the session up on a reload or reconnect.
+#   SESSION_STATE_BACKEND=sqlite   one SQLite WAL file shared by the replicas on one host
+#                                  (SESSION_STATE_FILE, default session_state.db)
+#   SESSION_STATE_BACKEND=redis    a Redis-compatible server shared by hosts (SESSION_STATE_REDIS_URL),
+#                                  needs the redis package
+# Only changed values are written, one row / hash field per widget key. Both backends expose the same
+# load / save / discard methods, so the SQLite one also stands in for Redis in local runs.
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+SESSION_STATE_BACKEND = os.environ.get("SESSION_STATE_BACKEND", "")
+SESSION_STATE_FILE = os.environ.get("SESSION_STATE_FILE", "session_state.db")
+SESSION_STATE_REDIS_URL = os.environ.get("SESSION_STATE_REDIS_URL", "redis://localhost:6379/0")
+STATE_TTL_DAYS = 14          # state of a token untouched this long is dropped
+
+_TOKEN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+
+def new_token():
+    return secrets.token_urlsafe(16)
+
+
+def valid_token(token):
+    return isinstance(token, str) and _TOKEN.fullmatch(token) is not None
+
+
+class SqliteStateBackend:
+    def __init__(self, path=SESSION_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS session_state (
+                token TEXT NOT NULL,
+                state_key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (token, state_key)
+            )"""
+        )
+        self.prune()
+
+    def load(self, token):
+        with self._lock:
+            rows = self._conn.execute("SELECT state_key, value FROM session_state WHERE token = ?", (token,)).fetchall()
+        return {state_key: json.loads(value) for state_key, value in rows}
+
+    def save(self, token, changes):
+        if not changes:
+            return
+        now = time.time()
+        rows = [(token, state_key, json.dumps(value), now) for state_key, value in changes.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO session_state (token, state_key, value, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (token, state_key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                # The connection is shared by every session of the process; never leave it inside a transaction
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def discard(self, token):
+        with self._lock:
+            self._conn.execute("DELETE FROM session_state WHERE token = ?", (token,))
+
+    def prune(self, ttl_days=STATE_TTL_DAYS):
+        cutoff = time.time() - ttl_days * 86400
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM session_state WHERE token IN "
+                "(SELECT token FROM session_state GROUP BY token HAVING MAX(updated_at) < ?)",
+                (cutoff,),
+            )
+
+
+class RedisStateBackend:
+    # One hash per token (field = state key, value = JSON), expiring STATE_TTL_DAYS after the last save
+    def __init__(self, url=SESSION_STATE_REDIS_URL, client=None, prefix="apreview:state:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("SESSION_STATE_BACKEND=redis needs the redis package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def load(self, token):
+        fields = self.client.hgetall(self.prefix + token)
+        return {_text(state_key): json.loads(value) for state_key, value in fields.items()}
+
+    def save(self, token, changes):
+        if not changes:
+            return
+        name = self.prefix + token
+        pipe = self.client.pipeline()
+        pipe.hset(name, mapping={state_key: json.dumps(value) for state_key, value in changes.items()})
+        pipe.expire(name, STATE_TTL_DAYS * 86400)
+        pipe.execute()
+
+    def discard(self, token):
+        self.client.delete(self.prefix + token)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def open_backend(kind=SESSION_STATE_BACKEND):
+    # None when no shared backend is configured (single-process deployment)
+    if not kind:
+        return None
+    if kind == "sqlite":
+        return SqliteStateBackend()
+    if kind == "redis":
+        return RedisStateBackend()
+    raise ValueError(f"Unknown SESSION_STATE_BACKEND {kind!r} (expected sqlite or redis)")
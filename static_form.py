@@ -0,0 +1,315 @@
+# Lightweight static-HTML entry point for the peer review form
+# Renders the same form_schema.py definitions as formapp.py into one static HTML page (inline CSS and
+# JS, served gzipped). Branching runs in the browser: show_if questions are toggled client side, and
+# PSLO3+ blocks are cloned from one <template> per loop as the "more PSLOs" questions are answered.
+# Submitting sends a single POST of the widget values, which the server checks against the schema,
+# turns into the same form_data as formapp.py (Plan.collect) and hands to the same outbox worker
+# (delivery.py), idempotency key and local response store. A reviewer costs one page download and
+# one POST: no websocket and no script thread on the server.
+#   GET  /         the form
+#   POST /submit   {"instance": "<random id of this page load>", "state": {widget key: value}}
+#                  -> {"status": "submitted" | "duplicate"} or 400 {"error": ..., "missing": [...]}
+#
+# Usage: python static_form.py [--host 0.0.0.0] [--port 8503]
+# (8501 is the Streamlit form's default port and 8502 the admin dashboard's)
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import logging
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import delivery
+import metrics
+from form_schema import MAX_PSLOS, PsloLoop, compile_schema, expand_block, numbering
+from response_store import ResponseStore
+
+logger = logging.getLogger(__name__)
+
+TITLE = "2025 AP Peer Reviewer"
+MAX_BODY_BYTES = 256 * 1024
+IDLE_TIMEOUT_SECONDS = 10
+MAX_TEXT_LENGTH = 20000
+
+# Template placeholders, e.g. "@@i@@" and "@@n21@@", filled in by the browser
+_PLACEHOLDERS = {name: f"@@{name}@@" for name in numbering(3)}
+
+_CSS = """
+body{font-family:system-ui,sans-serif;max-width:46rem;margin:auto;padding:1rem;line-height:1.4}
+fieldset{border:0;padding:0;margin:0 0 1rem}
+.q{margin:.75rem 0}.label{font-weight:600;margin:.25rem 0}
+.h label{display:inline-block;margin-right:1rem}.v label{display:block}
+input[type=text],textarea{width:100%;box-sizing:border-box;padding:.4rem}textarea{min-height:5rem}
+button{padding:.6rem 1.2rem;font-size:1rem}#status{font-weight:600}
+"""
+
+_JS = """
+const form = document.getElementById("review");
+const instance = crypto.randomUUID ? crypto.randomUUID().replace(/-/g, "") : String(Math.random()).slice(2) + Date.now();
+const N = JSON.parse(document.getElementById("numbering").textContent);
+const value = name => { const el = form.querySelector(`[name="${name}"]:checked`); return el ? el.value : null; };
+const loops = [...document.querySelectorAll(".loop")];
+function count(loop) { return 2 + loop.querySelector(".extra").children.length; }
+function add(loop) {
+  const i = count(loop) + 1, nums = N[i];
+  const html = loop.querySelector("template").innerHTML.replace(/@@(\\w+)@@/g, (_, k) => nums[k]);
+  const block = document.createElement("div");
+  block.innerHTML = html;
+  loop.querySelector(".extra").appendChild(block);
+}
+function sync() {
+  for (const loop of loops) {
+    const d = loop.dataset, open = d.keepOpen === "1" || value(d.gate) === "Yes";
+    if (value(d.gate) === "Yes" && count(loop) === 2) add(loop);
+    while (count(loop) >= 3 && count(loop) < """ + str(MAX_PSLOS) + """ && value(d.more.replace("@@i@@", count(loop))) === "Yes") add(loop);
+    loop.querySelector(".extra").hidden = !open;
+  }
+  for (const q of form.querySelectorAll("[data-show-if]")) {
+    const shown = value(q.dataset.showIf) === q.dataset.showValue;
+    q.hidden = !shown; q.disabled = !shown;
+  }
+}
+function collect() {
+  const state = {};
+  for (const el of form.elements) {
+    if (!el.name || el.matches(":disabled") || el.closest("[hidden]")) continue;
+    if (el.type === "radio") { if (!(el.name in state)) state[el.name] = null; if (el.checked) state[el.name] = el.value; }
+    else if (el.type === "checkbox") { state[el.name] = state[el.name] || []; if (el.checked) state[el.name].push(el.value); }
+    else state[el.name] = el.value;
+  }
+  for (const loop of loops) state[loop.dataset.counter] = count(loop);
+  return state;
+}
+form.addEventListener("change", sync);
+form.addEventListener("submit", async event => {
+  event.preventDefault();
+  const status = document.getElementById("status"), button = form.querySelector("button");
+  button.disabled = true; status.textContent = "Submitting...";
+  try {
+    const response = await fetch("submit", {method: "POST", headers: {"Content-Type": "application/json"},
+                                             body: JSON.stringify({instance, state: collect()})});
+    const reply = await response.json();
+    if (!response.ok) throw new Error(reply.error + (reply.missing ? ": " + reply.missing.join(", ") : ""));
+    status.textContent = reply.status === "duplicate"
+      ? "This form was already submitted. The repeat submission was ignored."
+      : "Thank you! Your form was successfully submitted. Reload the page to start a new form.";
+  } catch (error) {
+    status.textContent = "An error occurred: " + error.message;
+    button.disabled = false;
+  }
+});
+sync();
+"""
+
+
+# ------------------------------------RENDER-------------------------------------------------
+def _lines(lines):
+    # Empty lines are Streamlit spacers; the stylesheet spaces the page instead
+    return "".join(f"<p>{html.escape(line)}</p>" for line in lines if line)
+
+
+def _question(question):
+    if question.widget == "computed":
+        return ""
+    key = html.escape(question.key)
+    attrs = f' title="{html.escape(question.help)}"' if question.help else ""
+    if question.show_if:
+        attrs += f' data-show-if="{html.escape(question.show_if[0])}" data-show-value="{html.escape(question.show_if[1])}" hidden disabled'
+    label = f'<p class="label">{html.escape(question.label)}</p>' if question.label else ""
+    if question.widget in ("radio", "multiselect"):
+        kind = "radio" if question.widget == "radio" else "checkbox"
+        layout = "h" if question.horizontal else "v"
+        choices = "".join(
+            f'<label><input type="{kind}" name="{key}" value="{html.escape(choice)}">{html.escape(choice)}</label>'
+            for choice in question.choices
+        )
+        body = f'{label}<div class="{layout}">{choices}</div>'
+    elif question.widget == "text_area":
+        body = f'<label>{label}<textarea name="{key}"></textarea></label>'
+    else:
+        required = " required" if question.required else ""
+        body = f'<label>{label}<input type="text" name="{key}"{required}></label>'
+    return f'{_lines(question.before)}<fieldset class="q"{attrs}>{body}</fieldset>'
+
+
+def _section(section):
+    parts = [_lines(section.before)]
+    if section.title:
+        parts.append(f"<h2>{html.escape(section.title)}</h2>")
+    if section.heading:
+        parts.append(f"<h3>{html.escape(section.heading.lstrip('#').strip())}</h3>")
+    parts.append(_lines(section.intro))
+    parts.extend(_question(question) for question in section.questions)
+    parts.append(_lines(section.after))
+    return "".join(parts)
+
+
+def _loop(plan, loop):
+    block, more = expand_block(loop, _PLACEHOLDERS)
+    title = f"<h2>{html.escape(loop.title)}</h2>" if loop.title else ""
+    return (
+        f'<div class="loop" data-counter="{loop.counter}" data-gate="{loop.gate.key}" data-more="{html.escape(more.key)}"'
+        f' data-keep-open="{int(loop.keep_open)}">'
+        f"{title}{_lines(loop.intro)}{_section(plan.blocks[(loop.id, 1)])}{_section(plan.blocks[(loop.id, 2)])}"
+        f'{_question(loop.gate)}<div class="extra"></div>'
+        f"<template>{_section(block)}{_question(more)}</template>{_lines(loop.after)}</div>"
+    )
+
+
+def render_page(plan):
+    body = "".join(_loop(plan, part) if isinstance(part, PsloLoop) else _section(part) for part in plan.layout)
+    nums = json.dumps({i: numbering(i) for i in range(3, MAX_PSLOS + 1)}, separators=(",", ":"))
+    return (
+        '<!doctype html><html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width,initial-scale=1">'
+        f"<title>{TITLE}</title><style>{_CSS}</style></head><body><h1>{TITLE}</h1>"
+        f'<form id="review">{body}<button type="submit">Submit Full Form</button><p id="status"></p></form>'
+        f'<script type="application/json" id="numbering">{nums}</script><script>{_JS}</script></body></html>'
+    )
+
+
+# ------------------------------------SUBMIT-------------------------------------------------
+def parse_state(plan, raw):
+    # Keeps only known widget keys with values the schema allows; returns (state, missing labels)
+    if not isinstance(raw, dict):
+        raise ValueError("state must be an object of widget values")
+    counters = {part.counter for part in plan.layout if isinstance(part, PsloLoop)}
+    state = {}
+    for key in plan.state_keys:
+        if key not in raw or raw[key] is None:
+            continue
+        value = raw[key]
+        if key in counters:
+            # JSON integers only: int() would also take "3", 2.9, true or an overflowing 1e309
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"{key}: expected a whole number")
+            state[key] = min(max(value, 2), MAX_PSLOS)
+            continue
+        question = plan.questions[key]
+        if question.widget == "radio":
+            if value not in question.choices:
+                raise ValueError(f"{key}: {value!r} is not one of the choices")
+        elif question.widget == "multiselect":
+            if not isinstance(value, list) or not set(value) <= set(question.choices):
+                raise ValueError(f"{key}: unknown choice")
+            value = [choice for choice in question.choices if choice in value]
+        elif not isinstance(value, str) or len(value) > MAX_TEXT_LENGTH:
+            raise ValueError(f"{key}: expected text of at most {MAX_TEXT_LENGTH} characters")
+        state[key] = value
+    missing = [question.label for question in plan.required if not str(state.get(question.key, "")).strip()]
+    return state, missing
+
+
+class StaticFormServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, worker, store=None, plan=None):
+        super().__init__(address, _Handler)
+        self.worker = worker
+        self.store = store
+        self.plan = plan or compile_schema()
+        self.page = render_page(self.plan).encode()
+        self.page_gzip = gzip.compress(self.page, 9)
+        self.etag = '"' + hashlib.sha256(self.page).hexdigest()[:16] + '"'
+
+    def submit(self, body):
+        state, missing = parse_state(self.plan, body["state"])
+        if missing:
+            return 400, {"error": "Please fill in all required fields", "missing": missing}
+        form_data = self.plan.collect(state, computed={"Timestamp": datetime.now().strftime('%Y-%m-%dT%H:%M:%S')})
+        key = delivery.idempotency_key(str(body["instance"]), form_data["Reviewer Name"], form_data["College Name"], form_data["Program Name"])
+        started = time.perf_counter()
+        _, created = self.worker.submit(form_data, key)
+        metrics.observe("form_submit_seconds", time.perf_counter() - started, status="created" if created else "duplicate")
+        if created and self.store is not None:
+            try:
+                self.store.append(form_data, submission_id=key)
+            except Exception:
+                logger.exception("Could not append the submission to the local response store")
+        return 200, {"status": "submitted" if created else "duplicate"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_TIMEOUT_SECONDS     # an idle or stalled keep-alive connection frees its thread
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status, body):
+        self._reply(status, json.dumps(body).encode(), "application/json")
+
+    def do_GET(self):
+        server = self.server
+        if self.path.split("?")[0] != "/":
+            self._json(404, {"error": "not found"})
+            return
+        headers = {"ETag": server.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if self.headers.get("If-None-Match") == server.etag:
+            self._reply(304, b"", "text/html; charset=utf-8", headers)
+        elif "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._reply(200, server.page_gzip, "text/html; charset=utf-8", {**headers, "Content-Encoding": "gzip"})
+        else:
+            self._reply(200, server.page, "text/html; charset=utf-8", headers)
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/submit":
+            self._json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            length = 0
+        if length <= 0:
+            # Without a positive length the body can't be read without waiting for the client to close
+            self.close_connection = True
+            self._json(411, {"error": "Content-Length required"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._json(413, {"error": "submission too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length))
+            status, reply = self.server.submit(body)
+        except (ValueError, TypeError, KeyError) as e:
+            status, reply = 400, {"error": f"invalid submission ({e})"}
+        except Exception:
+            # Details stay in the server log
+            logger.exception("Static form submission failed")
+            status, reply = 500, {"error": "internal error, please try again"}
+        self._json(status, reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the peer review form as a static HTML page.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8503)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = ResponseStore()
+    store.start_flusher()
+    server = StaticFormServer((args.host, args.port), delivery.start_worker(), store)
+    print(f"Static review form on http://{args.host}:{args.port}/ ({len(server.page_gzip) / 1024:.1f} KB gzipped)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
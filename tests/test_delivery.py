@@ -0,0 +1,160 @@
+# Tests of the submission outbox and its delivery worker, against a fake HTTP session
+# Run with: python -m pytest tests
+
+import time
+
+import pytest
+import requests
+
+import delivery
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.text = "" if body is None else str(body)
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no JSON body")
+        return self._body
+
+
+class FakeSession:
+    # Answers each post with the next status code (or exception) in `replies`
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls.append(headers or {})
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply if isinstance(reply, FakeResponse) else FakeResponse(reply)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return delivery.Outbox(str(tmp_path / "outbox.db"))
+
+
+def worker(outbox, *replies, **options):
+    return delivery.DeliveryWorker(outbox, url="http://flow.invalid", session=FakeSession(*replies), **options)
+
+
+def make_due(outbox):
+    # Skip the backoff delay of every pending record
+    with outbox._connect() as conn:
+        conn.execute("UPDATE outbox SET next_attempt_at = 0 WHERE status = ?", (delivery.PENDING,))
+
+
+# ------------------------------------OUTBOX-------------------------------------------------
+def test_retryable_failure_is_retried_then_delivered(outbox):
+    w = worker(outbox, 503, requests.ConnectionError("down"), 200)
+    w.submit({"a": 1}, "key-1")
+    w.deliver_due()
+    assert outbox.counts() == {delivery.PENDING: 1}
+    make_due(outbox)
+    w.deliver_due()
+    make_due(outbox)
+    w.deliver_due()
+    assert outbox.counts() == {delivery.DELIVERED: 1}
+
+
+def test_rejected_record_goes_to_dead_letters(outbox):
+    w = worker(outbox, 400)
+    w.submit({"a": 1}, "key-1")
+    w.deliver_due()
+    assert outbox.counts() == {delivery.DEAD: 1}
+    assert outbox.dead_letters()[0][3] == 400
+    assert outbox.requeue_dead() == 1
+
+
+def test_retries_stop_after_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(delivery, "MAX_ATTEMPTS", 3)
+    w = worker(outbox, 500, 500, 500)
+    w.submit({"a": 1}, "key-1")
+    for _ in range(3):
+        make_due(outbox)
+        w.deliver_due()
+    assert outbox.counts() == {delivery.DEAD: 1}
+
+
+def test_claimed_record_is_leased(outbox):
+    outbox.add({"a": 1}, "key-1")
+    [record] = outbox.claim_due()
+    assert outbox.claim_due() == []
+    assert outbox.renew_lease(record)
+    # Once the lease expired and another worker claimed the record, the first one can't renew it
+    with outbox._connect() as conn:
+        conn.execute("UPDATE outbox SET next_attempt_at = ?", (time.time() - 1,))
+    assert len(outbox.claim_due()) == 1
+    assert not outbox.renew_lease(record)
+
+
+# ------------------------------------BATCHES-------------------------------------------------
+def test_rejected_batch_is_resent_record_by_record(outbox):
+    w = worker(outbox, 400, 200, 400, 200, batch_mode=True)
+    for i in range(3):
+        outbox.add({"a": i}, f"key-{i}")
+    w.deliver_batch(outbox.claim_due(limit=3))
+    assert outbox.counts() == {delivery.DELIVERED: 2, delivery.DEAD: 1}
+    assert len(w.session.calls) == 4
+
+
+def test_batch_is_settled_per_acknowledged_record(outbox):
+    ids = [outbox.add({"a": i}, f"key-{i}")[0] for i in range(3)]
+    ack = FakeResponse(200, [{"id": ids[0], "status": 200}, {"id": ids[1], "status": 400}])
+    w = worker(outbox, ack, batch_mode=True)
+    w.deliver_batch(outbox.claim_due(limit=3))
+    # The third record is missing from the acknowledgement, so it is retried
+    assert outbox.counts() == {delivery.DELIVERED: 1, delivery.DEAD: 1, delivery.PENDING: 1}
+
+
+def test_batch_sends_retries_on_their_own(outbox):
+    w = worker(outbox, 503, 200, 200, batch_mode=True)
+    outbox.add({"a": 0}, "key-0")
+    w.deliver(outbox.claim_due()[0])
+    make_due(outbox)
+    outbox.add({"a": 1}, "key-1")
+    w.deliver_batch(outbox.claim_due(limit=2))
+    assert outbox.counts() == {delivery.DELIVERED: 2}
+    # One failed single send, one batch of the new record, one single resend of the retry
+    assert len(w.session.calls) == 3
+    assert w.session.calls[2].get("Idempotency-Key") == "key-0"
+
+
+# ------------------------------------IDEMPOTENCY-------------------------------------------------
+def test_duplicate_key_is_stored_once(outbox):
+    first = outbox.add({"a": 1}, "key-1")
+    again = outbox.add({"a": 2}, "key-1")
+    assert first[1] is True
+    assert again == (first[0], False)
+    assert outbox.counts() == {delivery.PENDING: 1}
+
+
+def test_duplicate_submit_makes_no_request(outbox):
+    w = worker(outbox, 200)
+    w.submit({"a": 1}, "key-1")
+    w.deliver_due()
+    assert w.submit({"a": 1}, "key-1")[1] is False
+    w.deliver_due()
+    assert len(w.session.calls) == 1
+    assert w.session.calls[0]["Idempotency-Key"] == "key-1"
+
+
+def test_idempotency_key_ignores_case_and_spacing():
+    key = delivery.idempotency_key("form-1", "Ann  Lee", "College of X", "BS Y")
+    assert key == delivery.idempotency_key("form-1", "ann lee", " college of x", "BS  Y")
+    assert key != delivery.idempotency_key("form-2", "Ann Lee", "College of X", "BS Y")
+    assert key != delivery.idempotency_key("form-1", "Ann Lee", "College of X", "BS Z")
+
+
+def test_delivered_record_is_found_by_key(outbox):
+    w = worker(outbox, 200)
+    w.submit({"a": 1}, "key-1")
+    w.deliver_due()
+    assert outbox.find("key-1")["status"] == delivery.DELIVERED
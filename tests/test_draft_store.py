@@ -0,0 +1,59 @@
+# Tests of the draft store: delta records, compaction and discard
+# Run with: python -m pytest tests
+
+import sqlite3
+
+import pytest
+
+from draft_store import DraftStore
+
+
+@pytest.fixture
+def drafts(tmp_path):
+    return DraftStore(str(tmp_path / "drafts.db"))
+
+
+def delta_rows(store, key):
+    return store._conn.execute("SELECT COUNT(*) FROM draft_deltas WHERE draft_key = ?", (key,)).fetchone()[0]
+
+
+def test_draft_keeps_latest_value_of_every_widget(drafts):
+    drafts.save("ann|bs x", {"pslo1_q1": "Yes", "num_pslos": 3})
+    drafts.save("ann|bs x", {"pslo1_q1": "No", "feedback_pslo1": "Good"})
+    drafts.save("bob|bs y", {"pslo1_q1": "Cannot Confirm"})
+    assert drafts.load("ann|bs x") == {"pslo1_q1": "No", "num_pslos": 3, "feedback_pslo1": "Good"}
+    assert drafts.load("nobody|none") == {}
+
+
+def test_draft_compaction_keeps_the_draft(drafts):
+    for i in range(5):
+        drafts.save("ann|bs x", {"feedback_pslo1": f"v{i}", "num_pslos": i})
+    assert delta_rows(drafts, "ann|bs x") == 10
+    drafts.compact("ann|bs x")
+    assert delta_rows(drafts, "ann|bs x") == 2
+    assert drafts.load("ann|bs x") == {"feedback_pslo1": "v4", "num_pslos": 4}
+
+
+def test_draft_compacts_itself_after_enough_writes(drafts, monkeypatch):
+    monkeypatch.setattr("draft_store.COMPACT_EVERY", 4)
+    for i in range(4):
+        drafts.save("ann|bs x", {"feedback_pslo1": f"v{i}"})
+    assert delta_rows(drafts, "ann|bs x") == 1
+    assert drafts.load("ann|bs x") == {"feedback_pslo1": "v3"}
+
+
+def test_discarded_draft_is_gone(drafts):
+    drafts.save("ann|bs x", {"pslo1_q1": "Yes"})
+    drafts.discard("ann|bs x")
+    assert drafts.load("ann|bs x") == {}
+
+
+def test_failed_save_leaves_the_store_usable(drafts):
+    drafts._conn.execute(
+        "CREATE TRIGGER reject BEFORE INSERT ON draft_deltas WHEN NEW.widget_key = 'bad' "
+        "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    with pytest.raises(sqlite3.DatabaseError):
+        drafts.save("ann|bs x", {"pslo1_q1": "Yes", "bad": 1})
+    drafts.save("ann|bs x", {"pslo1_q2": "No"})
+    assert drafts.load("ann|bs x") == {"pslo1_q2": "No"}
@@ -0,0 +1,99 @@
+# Tests of the compiled form schema: the submitted columns must keep the layout the original
+# single-file formapp.py posted to the flow, which the Excel table behind the flow depends on
+# Run with: python -m pytest tests
+
+from form_schema import compile_schema
+
+
+# Keys of the JSON the original formapp.py posted for an empty form, in order
+BASELINE_COLUMNS = [
+    "Reviewer Name",
+    "College Name",
+    "Program Name",
+    "Program Info Complete",
+    "Yearly Assessment Complete",
+    "Missing Items",
+    "Timestamp",
+    "All PSLOs are listed",
+    "All core/required program courses are listed",
+    "The map contains indicators for which courses address a PSLO (X or I, R)",
+    "The map indicates where each PSLO is assessed (A)",
+    "The Assessment Schedule is indicated for each PSLO",
+    "At least one assessment instrument is listed for each PSLO",
+    "PSLO1 Quality 1", "PSLO1 Quality 2", "PSLO1 Quality 3", "PSLO1 Quality 4", "PSLO1 Quality 5",
+    "PSLO2 Quality 1", "PSLO2 Quality 2", "PSLO2 Quality 3", "PSLO2 Quality 4", "PSLO2 Quality 5",
+    "PSLO1 - Direct Measure Exists",
+    "PSLO1 - Instrument/Tool Stated",
+    "PSLO1 - Precision of Measure",
+    "PSLO1 - Alignment Explanation",
+    "PSLO1 - Additional Measures",
+    "PSLO1 - Measure Assessment",
+    "PSLO1 - Feedback",
+    "PSLO2 - Direct Measure Exists",
+    "PSLO2 - Instrument/Tool Stated",
+    "PSLO2 - Precision of Measure",
+    "PSLO2 - Alignment Explanation",
+    "PSLO2 - Course Matches Curriculum Map",
+    "PSLO2 - Semester Stated",
+    "PSLO2 - Sample Identified",
+    "PSLO2 - Reporting Description",
+    "PSLO2 - Additional Measures",
+    "PSLO2 - Measure Assessment",
+    "PSLO2 - Feedback",
+    "Student Success - Outcome Identified",
+    "Student Success - Measure Provided",
+    "Appendix - Table of Contents",
+    "Appendix - PSLO Descriptions Included",
+    "Appendix - Missing Details",
+    "Estimated Duration (Minutes)",
+]
+
+
+def quality_columns(i):
+    return [f"PSLO{i} Quality {q}" for q in range(1, 6)]
+
+
+def methods_columns(i):
+    return [
+        f"There is at least one direct measure (PSLO{i})",
+        f"The assessment instrument/tools are stated (PSLO{i})",
+        f"The first direct measure is precise (PSLO{i})",
+        f"The explanation aligns assessment with PSLO (PSLO{i})",
+        f"The course stated in explanation matches curriculum map (PSLO{i})",
+        f"The semester of assessment is stated (PSLO{i})",
+        f"The sample (who will be assessed) is identified (PSLO{i})",
+        f"Description of reporting results is appropriate (PSLO{i})",
+        f"PSLO{i} - Additional Measures",
+        f"PSLO{i} - Measure Assessment",
+        f"PSLO{i} - Feedback",
+        f"PSLO{i} - Another PSLO After",
+    ]
+
+
+def test_collect_matches_baseline_layout():
+    plan = compile_schema()
+    assert list(plan.collect({}, computed={"Timestamp": "t"})) == BASELINE_COLUMNS
+
+
+def test_collect_places_added_pslos_like_the_baseline():
+    # PSLO3+ quality blocks follow PSLO2 Quality; PSLO3+ methods blocks follow PSLO2 - Feedback
+    plan = compile_schema()
+    state = {
+        "more_pslo_2": "Yes", "num_pslos": 4, "more_pslo_3": "Yes", "more_pslo_4": "No",
+        "another_pslo_pslo2": "Yes", "num_pslos_mm": 3, "another_pslo_mm_3": "No",
+    }
+    quality_end = BASELINE_COLUMNS.index("PSLO2 Quality 5") + 1
+    methods_end = BASELINE_COLUMNS.index("PSLO2 - Feedback") + 1
+    expected = (
+        BASELINE_COLUMNS[:quality_end] + quality_columns(3) + quality_columns(4)
+        + BASELINE_COLUMNS[quality_end:methods_end] + methods_columns(3)
+        + BASELINE_COLUMNS[methods_end:]
+    )
+    assert list(plan.collect(state, computed={"Timestamp": "t"})) == expected
+
+
+def test_columns_hold_every_pslo():
+    columns = [column.name for column in compile_schema().columns]
+    assert len(columns) == len(set(columns))
+    assert "PSLO28 Quality 5" in columns
+    assert "PSLO28 - Another PSLO After" in columns
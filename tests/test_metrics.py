@@ -0,0 +1,47 @@
+# Tests of the metrics registry: percentile summaries and the Prometheus text format
+# Run with: python -m pytest tests
+
+from metrics import Registry
+
+HISTOGRAMS = {"form_rerun_seconds": ("Wall time of one script run", (0.1, 1))}
+
+
+def test_prometheus_text_has_cumulative_buckets_per_label():
+    registry = Registry(HISTOGRAMS)
+    for value in (0.05, 0.5, 0.5, 3):
+        registry.observe("form_rerun_seconds", value, kind="full")
+    registry.observe("form_rerun_seconds", 0.2, kind="fragment")
+    lines = registry.prometheus_text().splitlines()
+    assert lines[:2] == ["# HELP form_rerun_seconds Wall time of one script run", "# TYPE form_rerun_seconds histogram"]
+    assert 'form_rerun_seconds_bucket{kind="fragment",le="1"} 1' in lines
+    assert [line for line in lines if 'kind="full"' in line] == [
+        'form_rerun_seconds_bucket{kind="full",le="0.1"} 1',
+        'form_rerun_seconds_bucket{kind="full",le="1"} 3',
+        'form_rerun_seconds_bucket{kind="full",le="+Inf"} 4',
+        'form_rerun_seconds_sum{kind="full"} 4.050000',
+        'form_rerun_seconds_count{kind="full"} 4',
+    ]
+
+
+def test_unlabelled_series_has_no_label_braces():
+    registry = Registry(HISTOGRAMS)
+    registry.observe("form_rerun_seconds", 0.5)
+    assert "form_rerun_seconds_count 1" in registry.prometheus_text().splitlines()
+
+
+def test_summary_percentiles():
+    registry = Registry(HISTOGRAMS)
+    for value in range(1, 101):
+        registry.observe("form_rerun_seconds", value / 100, kind="full")
+    assert registry.summary() == {
+        "form_rerun_seconds": {"kind=full": {"count": 100, "p50": 0.51, "p95": 0.96, "max": 1.0}},
+    }
+
+
+def test_empty_registry():
+    registry = Registry(HISTOGRAMS)
+    assert registry.summary() == {}
+    assert registry.prometheus_text().splitlines() == [
+        "# HELP form_rerun_seconds Wall time of one script run",
+        "# TYPE form_rerun_seconds histogram",
+    ]
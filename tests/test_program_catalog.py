@@ -0,0 +1,54 @@
+# Tests of the program catalog index: ranking of prefix, word-prefix and trigram matches
+# Run with: python -m pytest tests
+
+from program_catalog import CatalogIndex, Program
+
+PROGRAMS = [
+    Program("College of Engineering", "BS Civil Engineering", 6),
+    Program("College of Engineering", "MS Civil Engineering", 4),
+    Program("College of Engineering", "BS Mechanical Engineering", 5),
+    Program("College of Engineering", "BS Electrical Engineering"),
+    Program("College of Arts and Sciences", "BA Biology"),
+    Program("College of Arts and Sciences", "BS Biology"),
+    Program("College of Arts and Sciences", "BA History"),
+    Program("College of Business", "BS Accounting"),
+    Program("College of Business", "MBA"),
+]
+
+
+def programs(results):
+    return [p.program for p in results]
+
+
+def test_name_prefix_hits_come_first_in_name_order():
+    index = CatalogIndex(PROGRAMS)
+    assert programs(index.search("bs"))[:5] == [
+        "BS Accounting", "BS Biology", "BS Civil Engineering", "BS Electrical Engineering", "BS Mechanical Engineering",
+    ]
+    assert programs(index.search("bs", limit=2)) == ["BS Accounting", "BS Biology"]
+
+
+def test_every_typed_word_must_start_a_program_or_college_word():
+    index = CatalogIndex(PROGRAMS)
+    assert programs(index.search("civ eng"))[:2] == ["BS Civil Engineering", "MS Civil Engineering"]
+    assert programs(index.search("business", limit=2)) == ["BS Accounting", "MBA"]
+
+
+def test_name_prefix_outranks_word_prefix():
+    index = CatalogIndex(PROGRAMS)
+    results = programs(index.search("ms", limit=3))
+    assert results[0] == "MS Civil Engineering"
+
+
+def test_typos_fall_back_to_trigram_similarity():
+    index = CatalogIndex(PROGRAMS)
+    assert programs(index.search("mechnical enginering"))[0] == "BS Mechanical Engineering"
+    assert programs(index.search("biolgy", limit=2)) == ["BA Biology", "BS Biology"]
+
+
+def test_unmatched_and_empty_queries():
+    index = CatalogIndex(PROGRAMS)
+    assert index.search("") == []
+    assert index.search("  ?! ") == []
+    assert index.search("xqzw") == []
+    assert CatalogIndex([]).search("bs") == []
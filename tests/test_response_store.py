@@ -0,0 +1,49 @@
+# Tests of the response store: the JSONL append log, flushing it into Parquet and compaction
+# Run with: python -m pytest tests
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+import response_store
+from response_store import ResponseStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResponseStore(str(tmp_path / "responses"))
+
+
+def test_appended_rows_are_read_after_a_flush(store):
+    store.append({"College Name": "C", "PSLO1 Quality 1": "Yes"}, submission_id="a", submitted_at=datetime(2025, 4, 2))
+    store.append({"College Name": "D"}, submission_id="b", submitted_at=datetime(2025, 5, 1))
+    assert store.files() == []
+    assert store.flush() == 2
+    frame = store.load(columns=["submission_id", "College Name", "PSLO1 Quality 1"])
+    assert sorted(frame["submission_id"]) == ["a", "b"]
+    assert [os.path.basename(p) for p in store.partitions()] == ["month=2025-04", "month=2025-05"]
+    assert store.flush() == 0
+
+
+def test_log_of_an_exited_process_is_taken_over(store):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    row = {"submission_id": "orphan", "submitted_at": "2025-04-02T10:00:00", "College Name": "C"}
+    with open(os.path.join(store.root, response_store.LOG_DIR, f"log-{dead.pid}.jsonl"), "w") as f:
+        f.write(json.dumps(row) + "\n" + '{"submission_id": "cut')
+    assert store.flush() == 1
+    assert list(store.load(columns=["submission_id"])["submission_id"]) == ["orphan"]
+    assert os.listdir(os.path.join(store.root, response_store.LOG_DIR)) == []
+
+
+def test_compaction_merges_parts_and_drops_replayed_rows(store, monkeypatch):
+    monkeypatch.setattr(response_store, "COMPACT_AFTER_PARTS", 3)
+    for submission_id in ["a", "b", "b"]:
+        store.append({"College Name": "C"}, submission_id=submission_id, submitted_at=datetime(2025, 4, 2))
+        store.flush_and_compact()
+    assert len(store.files()) == 1
+    assert sorted(store.load(columns=["submission_id"])["submission_id"]) == ["a", "b"]
@@ -0,0 +1,82 @@
+# Tests of rubric scoring on a small hand-checked frame
+# Run with: python -m pytest tests
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import scoring
+
+AREAS = {"Rubric": ["q1", "q2", "q3", "q4"]}
+
+
+@pytest.fixture
+def frame():
+    rows = [
+        # college, program, reviewer, q1..q4, minutes, submitted_at
+        ("C1", "P1", "Ann", "No", "No", "No", "No", "60", "2025-04-01"),     # superseded by Ann's later review
+        ("C1", "P1", "Ann", "Yes", "Yes", "No", "Cannot Confirm", "30", "2025-04-02"),
+        ("c1 ", "p1", "Bob", "Yes", "No", "No", None, "45 minutes", "2025-04-03"),
+        ("C2", "P2", "ann", "Yes", "Yes", "Yes", "Yes", "n/a", "2025-04-04"),
+    ]
+    columns = [scoring.COLLEGE, scoring.PROGRAM, scoring.REVIEWER, "q1", "q2", "q3", "q4", scoring.DURATION, "submitted_at"]
+    frame = pd.DataFrame(rows, columns=columns)
+    frame["submitted_at"] = pd.to_datetime(frame["submitted_at"])
+    return frame
+
+
+def test_rubric_scores_by_program(frame):
+    scores = scoring.rubric_scores(frame, AREAS, by="program")
+    assert list(scores["Program"]) == ["P1", "P2"]
+    assert list(scores["Reviews"]) == [3, 1]
+    # P1: 3 Yes, 7 No and 1 Cannot out of 11 answers
+    assert list(scores["Rubric: Yes %"]) == [27.3, 100.0]
+    assert list(scores["Rubric: No %"]) == [63.6, 0.0]
+    assert list(scores["Rubric: Cannot %"]) == [9.1, 0.0]
+
+
+def test_rubric_scores_by_college(frame):
+    scores = scoring.rubric_scores(frame, AREAS, by="college")
+    assert list(scores.columns[:2]) == ["College", "Reviews"]
+    assert list(scores["College"]) == ["C1", "C2"]
+    assert list(scores["Rubric: Yes %"]) == [27.3, 100.0]
+
+
+def test_unanswered_area_has_no_rate(frame):
+    frame[["q1", "q2", "q3", "q4"]] = None
+    assert scoring.rubric_scores(frame, AREAS)["Rubric: Yes %"].isna().all()
+
+
+def test_reviewer_agreement_kappa(frame):
+    agreement = scoring.reviewer_agreement(frame, AREAS)
+    assert len(agreement) == 1
+    row = agreement.iloc[0]
+    assert (row["Reviewer A"], row["Reviewer B"]) == ("Ann", "Bob")
+    # Latest reviews: Ann Yes/Yes/No/Cannot, Bob Yes/No/No/-; q4 is not compared.
+    # Observed 2/3; chance (2/3 * 1/3) + (1/3 * 2/3) = 4/9; kappa (2/3 - 4/9) / (1 - 4/9) = 0.4
+    assert row["Items compared"] == 3
+    assert row["Agreement %"] == 66.7
+    assert row["Cohen's kappa"] == 0.4
+
+
+def test_reviewer_agreement_without_second_reviewer(frame):
+    agreement = scoring.reviewer_agreement(frame[frame[scoring.REVIEWER] != "Bob"], AREAS)
+    assert agreement.empty
+    assert "Cohen's kappa" in agreement.columns
+
+
+def test_identical_answers_have_no_kappa(frame):
+    frame.loc[2, ["q1", "q2", "q3", "q4"]] = ["Yes", "Yes", "Yes", "Yes"]
+    frame.loc[1, ["q1", "q2", "q3", "q4"]] = ["Yes", "Yes", "Yes", "Yes"]
+    row = scoring.reviewer_agreement(frame, AREAS).iloc[0]
+    assert row["Agreement %"] == 100.0
+    assert np.isnan(row["Cohen's kappa"])
+
+
+def test_duration_stats(frame):
+    per_reviewer, overall = scoring.duration_stats(frame)
+    ann = per_reviewer.set_index("Reviewer").loc["Ann"]
+    assert (ann["Reviews"], ann["Reported"], ann["Median"], ann["Min"], ann["Max"]) == (3, 2, 45.0, 30.0, 60.0)
+    assert overall["count"] == 3
+    assert overall["median"] == 45.0
+    assert overall["mean"] == 45.0
@@ -0,0 +1,41 @@
+# Tests of the SQLite shared session-state backend
+# Run with: python -m pytest tests
+
+import sqlite3
+
+import pytest
+
+from state_backend import SqliteStateBackend, new_token, valid_token
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SqliteStateBackend(str(tmp_path / "state.db"))
+
+
+def test_saved_state_is_loaded_per_token(backend):
+    backend.save("token-a", {"num_pslos": 3, "pslo1_q1": "Yes"})
+    backend.save("token-a", {"num_pslos": 4})
+    backend.save("token-b", {"pslo1_q1": "No"})
+    assert backend.load("token-a") == {"num_pslos": 4, "pslo1_q1": "Yes"}
+    backend.discard("token-a")
+    assert backend.load("token-a") == {}
+    assert backend.load("token-b") == {"pslo1_q1": "No"}
+
+
+def test_failed_save_leaves_the_backend_usable(backend):
+    backend._conn.execute(
+        "CREATE TRIGGER reject BEFORE INSERT ON session_state WHEN NEW.state_key = 'bad' "
+        "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    with pytest.raises(sqlite3.DatabaseError):
+        backend.save("token-a", {"pslo1_q1": "Yes", "bad": 1})
+    backend.save("token-a", {"pslo1_q2": "No"})
+    assert backend.load("token-a") == {"pslo1_q2": "No"}
+
+
+def test_tokens():
+    assert valid_token(new_token())
+    assert not valid_token("short")
+    assert not valid_token("../../etc/passwd-and-more")
+    assert not valid_token(None)
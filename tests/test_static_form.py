@@ -0,0 +1,141 @@
+# Tests of the static form's handling of untrusted submissions
+# Run with: python -m pytest tests
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from form_schema import compile_schema
+from static_form import StaticFormServer, parse_state
+
+PLAN = compile_schema()
+IDENTIFIERS = {"reviewer_name": "Ann", "college_name": "College of X", "program_name": "BS Y"}
+
+
+def complete_state(**values):
+    # Every required question answered with a valid value
+    state = dict(IDENTIFIERS)
+    for question in PLAN.required:
+        if question.key not in state:
+            state[question.key] = question.choices[0] if question.widget == "radio" else "Answer"
+    state.update(values)
+    return state
+
+
+# ------------------------------------PARSE STATE-------------------------------------------------
+def test_valid_state_is_accepted():
+    state, missing = parse_state(PLAN, complete_state(num_pslos=5, more_pslo_2="Yes", feedback_pslo1="Good"))
+    assert missing == []
+    assert state["num_pslos"] == 5
+    assert state["feedback_pslo1"] == "Good"
+
+
+def test_counters_are_clamped():
+    assert parse_state(PLAN, {"num_pslos": 99})[0]["num_pslos"] == 28
+    assert parse_state(PLAN, {"num_pslos": -3})[0]["num_pslos"] == 2
+
+
+def test_unknown_keys_and_nulls_are_dropped():
+    state, _ = parse_state(PLAN, {"not_a_widget": "x", "feedback_pslo1": None, "reviewer_name": "Ann"})
+    assert state == {"reviewer_name": "Ann"}
+
+
+def test_missing_required_answers_are_listed():
+    _, missing = parse_state(PLAN, {})
+    assert len(missing) == len(PLAN.required)
+
+
+def test_multiselect_keeps_choice_order():
+    key, question = next((k, q) for k, q in PLAN.questions.items() if q.widget == "multiselect")
+    state, _ = parse_state(PLAN, {key: list(reversed(question.choices[:2]))})
+    assert state[key] == list(question.choices[:2])
+
+
+@pytest.mark.parametrize("raw", [
+    {"num_pslos": 1e309},
+    {"num_pslos": "3"},
+    {"num_pslos": 3.0},
+    {"num_pslos": True},
+    {"more_pslo_2": "Maybe"},
+    {"more_pslo_2": ["Yes"]},
+    {"reviewer_name": 5},
+    {"reviewer_name": "x" * 20001},
+    ["reviewer_name"],
+])
+def test_invalid_values_are_rejected(raw):
+    with pytest.raises(ValueError):
+        parse_state(PLAN, raw)
+
+
+def test_unknown_multiselect_choice_is_rejected():
+    key = next(k for k, q in PLAN.questions.items() if q.widget == "multiselect")
+    with pytest.raises(ValueError):
+        parse_state(PLAN, {key: ["Something else"]})
+
+
+# ------------------------------------HTTP-------------------------------------------------
+class FakeWorker:
+    def __init__(self, error=None):
+        self.error = error
+        self.keys = set()
+
+    def submit(self, form_data, key):
+        if self.error:
+            raise self.error
+        created = key not in self.keys
+        self.keys.add(key)
+        return 1, created
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(worker):
+        server = StaticFormServer(("127.0.0.1", 0), worker, plan=PLAN)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server.server_address[1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def post(port, body):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    conn.request("POST", "/submit", data, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    reply = response.status, json.loads(response.read())
+    conn.close()
+    return reply
+
+
+def test_submission_and_duplicate(serve):
+    port = serve(FakeWorker())
+    body = {"instance": "abc", "state": complete_state()}
+    assert post(port, body) == (200, {"status": "submitted"})
+    assert post(port, body) == (200, {"status": "duplicate"})
+
+
+@pytest.mark.parametrize("body", [
+    b'{"instance": "abc", "state": {"num_pslos": 1e309}}',
+    b"not json",
+    b'{"state": {}}',
+    b"[]",
+])
+def test_malformed_submission_is_a_400(serve, body):
+    status, reply = post(serve(FakeWorker()), body)
+    assert status == 400
+    assert "error" in reply
+
+
+def test_server_error_does_not_leak_details(serve):
+    port = serve(FakeWorker(RuntimeError("database is at /secret/path")))
+    status, reply = post(port, {"instance": "abc", "state": complete_state()})
+    assert status == 500
+    assert "secret" not in reply["error"]
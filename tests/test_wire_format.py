@@ -0,0 +1,41 @@
+# Tests of the compact wire format: encoding and decoding must give back the wide submission
+# Run with: python -m pytest tests
+
+import pytest
+
+import wire_format
+from form_schema import compile_schema
+
+
+def answered_state(plan, pslos):
+    # Every question answered, with `pslos` PSLO blocks open in each loop
+    state = {}
+    for key, question in plan.questions.items():
+        if question.widget == "radio":
+            state[key] = question.choices[-1]
+        elif question.widget == "multiselect":
+            state[key] = list(question.choices[:2])
+        else:
+            state[key] = f"Answer to {key}"
+    state.update(plan.pslo_prefill(pslos))
+    return state
+
+
+@pytest.mark.parametrize("pslos", [2, 5, 28])
+def test_wire_format_round_trip(pslos):
+    plan = compile_schema()
+    form_data = plan.collect(answered_state(plan, pslos), computed={"Timestamp": "2025-04-01T09:30:00"})
+    envelope = wire_format.loads(wire_format.dumps(wire_format.encode(form_data), compress=True))
+    assert wire_format.decode(envelope) == form_data
+    assert list(wire_format.decode(envelope)) == list(form_data)
+
+
+def test_wire_format_round_trip_of_empty_form():
+    plan = compile_schema()
+    form_data = plan.collect({}, computed={"Timestamp": "2025-04-01T09:30:00"})
+    assert wire_format.decode(wire_format.encode(form_data)) == form_data
+
+
+def test_wire_format_rejects_other_schema_version():
+    with pytest.raises(ValueError):
+        wire_format.decode({"v": -1, "n": {}, "a": {}})
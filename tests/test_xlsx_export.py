@@ -0,0 +1,76 @@
+# Tests of the streaming Excel export: per-section sheets and the long-format PSLO sheets
+# Run with: python -m pytest tests
+
+import os
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+import xlsx_export
+from form_schema import compile_schema
+from response_store import ResponseStore
+
+PLAN = compile_schema()
+
+
+def review(reviewer, program, **answers):
+    return {"Reviewer Name": reviewer, "College Name": "College of X", "Program Name": program, **answers}
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    store = ResponseStore(str(tmp_path / "responses"), plan=PLAN)
+    store.append(review(
+        "Ann", "BS Y",
+        **{"Program Info Complete": "Yes", "PSLO1 Quality 1": "Yes", "PSLO2 Quality 1": "No",
+           "PSLO3 Quality 1": "Cannot Confirm", "PSLO3 Quality 5": "Yes",
+           "PSLO1 - Feedback": "Clear", "There is at least one direct measure (PSLO3)": "Yes",
+           "PSLO3 - Feedback": "Add a rubric"},
+    ), submission_id="a", submitted_at=datetime(2025, 4, 2, 9, 0))
+    store.append(review("Bob", "BA Z", **{"PSLO1 Quality 2": "No"}), submission_id="b", submitted_at=datetime(2025, 4, 3, 9, 0))
+    store.flush()
+    path = xlsx_export.export_store(store, PLAN, directory=str(tmp_path))
+    yield load_workbook(path, read_only=True)
+    os.remove(path)
+
+
+def rows(workbook, name):
+    return [list(row) for row in workbook[name].iter_rows(values_only=True)]
+
+
+def by_header(sheet_rows):
+    # Trailing empty cells are not stored, so rows are padded to the header
+    header, *body = sheet_rows
+    return [dict(zip(header, row + [None] * (len(header) - len(row)))) for row in body]
+
+
+def test_one_sheet_per_section(workbook):
+    assert workbook.sheetnames == list(xlsx_export.SHEET_NAMES.values())
+
+
+def test_section_sheet_has_one_row_per_review(workbook):
+    sheet = rows(workbook, "Plan Completion")
+    assert sheet[0] == xlsx_export.KEY_COLUMNS + ["Program Info Complete"]
+    reviews = by_header(sheet)
+    assert [(r["submission_id"], r["Reviewer Name"], r["Program Info Complete"]) for r in reviews] == [
+        ("a", "Ann", "Yes"), ("b", "Bob", None),
+    ]
+
+
+def test_pslo_quality_is_long_format(workbook):
+    sheet = rows(workbook, "PSLO Quality")
+    assert sheet[0] == xlsx_export.KEY_COLUMNS + ["PSLO"] + [f"Quality {q}" for q in range(1, 6)]
+    # One row per review and answered PSLO, in review then PSLO order
+    assert [(r["submission_id"], r["PSLO"], r["Quality 1"], r["Quality 2"], r["Quality 5"]) for r in by_header(sheet)] == [
+        ("a", 1, "Yes", None, None),
+        ("a", 2, "No", None, None),
+        ("a", 3, "Cannot Confirm", None, "Yes"),
+        ("b", 1, None, "No", None),
+    ]
+
+
+def test_methods_sheet_shares_headers_across_pslos(workbook):
+    reviews = by_header(rows(workbook, "Methods and Measures"))
+    assert [(r["submission_id"], r["PSLO"], r["Feedback"]) for r in reviews] == [("a", 1, "Clear"), ("a", 3, "Add a rubric")]
+    assert reviews[1]["Direct Measure Exists"] == "Yes"
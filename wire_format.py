@@ -0,0 +1,160 @@
+# Compact, versioned wire format for submissions
+# The wide form_data dict is keyed by full English sentences, up to ~28x14 per-PSLO columns. The
+# compact envelope replaces every column with a short field code from the schema's codebook, sends
+# choices as their index in the option set, and leaves out unanswered fields and PSLOs altogether:
+#
+#     {"v": 1, "n": {"pq": 4, "mm": 3}, "a": {"id.reviewer": "Jane Doe", "cm.c1": 0, "pq3.q2": 2, ...}}
+#
+# "v" is form_schema.SCHEMA_VERSION, "n" the number of PSLO blocks shown per loop, and the optional
+# "k" the submission's idempotency key (added by delivery.py). decode() expands an envelope back to
+# the current wide layout, column for column. The JSON can be gzipped.
+#
+# Usage: python wire_format.py decode submission.json[.gz]   (prints the wide layout as JSON)
+
+import gzip
+import json
+import sys
+
+from form_schema import compile_schema
+
+SECTION_CODES = {
+    "identifiers": "id",
+    "plan_completion": "pc",
+    "yearly_assessment": "ya",
+    "curriculum_map": "cm",
+    "pslo_quality": "pq",
+    "methods_measures": "mm",
+    "student_success": "ss",
+    "appendix": "ap",
+    "estimated_duration": "ed",
+}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class Codebook:
+    def __init__(self, plan):
+        self.plan = plan
+        self.version = plan.version
+        self.fields = []         # (code, Column) in column order
+        self.by_name = {}
+        self.by_key = {}         # widget key -> Column, to evaluate show_if conditions
+        for column in plan.columns:
+            prefix = SECTION_CODES[column.section]
+            code = f"{prefix}{column.pslo}.{column.question.id}" if column.pslo else f"{prefix}.{column.question.id}"
+            self.fields.append((code, column))
+            self.by_name[column.name] = (code, column)
+            self.by_key[column.question.key] = column
+        self.loops = {SECTION_CODES[loop_id]: loop_id for loop_id in {c.loop for c in plan.columns if c.loop}}
+
+    # ------------------------------------ENCODE-------------------------------------------------
+    def encode(self, form_data):
+        answers = {}
+        counts = {code: 2 for code in self.loops}
+        for name, value in form_data.items():
+            if name not in self.by_name:
+                raise KeyError(f"Column {name!r} is not in schema version {self.version}")
+            code, column = self.by_name[name]
+            if column.loop:
+                counts[SECTION_CODES[column.loop]] = max(counts[SECTION_CODES[column.loop]], column.pslo)
+            value = self._encode_value(column.question, value)
+            if value is not None:
+                answers[code] = value
+        return {"v": self.version, "n": counts, "a": answers}
+
+    @staticmethod
+    def _encode_value(question, value):
+        # None / "" / "None" are left out; decode() restores them from the schema
+        if value is None or value == "":
+            return None
+        if question.widget == "multiselect":
+            if value == "None":
+                return None
+            return [question.choices.index(item) for item in value.split(", ")]
+        if question.widget == "radio":
+            return question.choices.index(value)
+        return value
+
+    # ------------------------------------DECODE-------------------------------------------------
+    def decode(self, envelope):
+        if envelope.get("v") != self.version:
+            raise ValueError(f"Submission uses schema version {envelope.get('v')}, this codebook is version {self.version}")
+        counts = envelope.get("n", {})
+        answers = envelope.get("a", {})
+        wide = {}
+        for code, column in self.fields:
+            if column.loop and column.pslo > counts.get(SECTION_CODES[column.loop], 2):
+                continue
+            question = column.question
+            if code in answers:
+                wide[column.name] = self._decode_value(question, answers[code])
+            elif question.show_if and self._hidden(question, wide):
+                wide[column.name] = "None" if question.widget == "multiselect" else ""
+            elif question.widget == "multiselect":
+                wide[column.name] = "None"
+            else:
+                wide[column.name] = question.default
+        if "k" in envelope:
+            wide["Idempotency Key"] = envelope["k"]
+        return wide
+
+    def _hidden(self, question, wide):
+        controller = self.by_key.get(question.show_if[0])
+        return controller is None or wide.get(controller.name) != question.show_if[1]
+
+    @staticmethod
+    def _decode_value(question, value):
+        if question.widget == "multiselect":
+            return ", ".join(question.choices[index] for index in value)
+        if question.widget == "radio":
+            return question.choices[value]
+        return value
+
+
+_codebook = None
+
+
+def codebook():
+    global _codebook
+    if _codebook is None:
+        _codebook = Codebook(compile_schema())
+    return _codebook
+
+
+def encode(form_data):
+    return codebook().encode(form_data)
+
+
+def decode(envelope):
+    return codebook().decode(envelope)
+
+
+def dumps(envelope, compress=False):
+    data = json.dumps(envelope, separators=(",", ":"), ensure_ascii=False).encode()
+    return gzip.compress(data) if compress else data
+
+
+def loads(data):
+    if data[:2] == _GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def main(argv):
+    if len(argv) != 3 or argv[1] != "decode":
+        print("Usage: python wire_format.py decode submission.json[.gz]", file=sys.stderr)
+        return 2
+    with open(argv[2], "rb") as f:
+        payload = loads(f.read())
+    # A batched delivery body is a list of {"id": ..., "data": envelope}
+    if isinstance(payload, list):
+        decoded = [{"id": item.get("id"), "data": decode(item["data"])} for item in payload]
+    else:
+        decoded = decode(payload)
+    json.dump(decoded, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
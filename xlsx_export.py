@@ -0,0 +1,112 @@
+# Streaming Excel export of stored reviews
+# Uses an openpyxl write-only workbook: one sheet per form section with one row per review, and the
+# per-PSLO sections (PSLO Quality, Methods and Measures) in long format, one row per review and PSLO.
+# Reviews are read from response_store.py in batches and rows are streamed into the sheets as they
+# are produced, so memory stays bounded no matter how many reviews exist. The workbook is written to
+# a file on disk, never built in memory.
+
+import os
+import re
+import tempfile
+
+import pandas as pd
+from openpyxl import Workbook
+
+from form_schema import PsloLoop
+
+BATCH_SIZE = 500
+KEY_COLUMNS = ["submission_id", "submitted_at", "Reviewer Name", "College Name", "Program Name"]
+
+SHEET_NAMES = {
+    "identifiers": "Reviews",
+    "plan_completion": "Plan Completion",
+    "yearly_assessment": "Yearly Assessment",
+    "curriculum_map": "Curriculum Map",
+    "pslo_quality": "PSLO Quality",
+    "methods_measures": "Methods and Measures",
+    "student_success": "Student Success",
+    "appendix": "Appendix",
+    "estimated_duration": "Estimated Duration",
+}
+
+
+def _generic_header(name, i):
+    # "PSLO3 - Feedback" / "PSLO3 Quality 1" / "... is stated (PSLO3)" -> header shared by every PSLO
+    return re.sub(rf"^PSLO{i}( - |\s)|\s\(PSLO{i}\)$", "", name)
+
+
+class _SectionSheet:
+    def __init__(self, workbook, section_id, columns):
+        self.sheet = workbook.create_sheet(SHEET_NAMES.get(section_id, section_id)[:31])
+        self.columns = [c for c in columns if c not in KEY_COLUMNS]
+        self.sheet.append(KEY_COLUMNS + self.columns)
+
+    def write(self, frame):
+        for row in frame[KEY_COLUMNS + self.columns].itertuples(index=False, name=None):
+            self.sheet.append(row)
+
+
+class _PsloSheet:
+    def __init__(self, workbook, loop_id, columns):
+        self.sheet = workbook.create_sheet(SHEET_NAMES.get(loop_id, loop_id)[:31])
+        # {i: {header: column name}}. PSLO1/PSLO2 and PSLO3+ columns are named differently, so the
+        # header comes from the first column seen for each question ID
+        self.by_pslo = {}
+        headers = {}
+        for column in columns:
+            header = headers.setdefault(column.question.id, _generic_header(column.name, column.pslo))
+            self.by_pslo.setdefault(column.pslo, {})[header] = column.name
+        self.headers = list(headers.values())
+        self.sheet.append(KEY_COLUMNS + ["PSLO"] + self.headers)
+
+    def write(self, frame):
+        pieces = []
+        for i, columns in self.by_pslo.items():
+            present = {header: name for header, name in columns.items() if name in frame.columns}
+            piece = frame[KEY_COLUMNS + list(present.values())].rename(columns={v: k for k, v in present.items()})
+            answers = piece[list(present)]
+            piece = piece[(answers.notna() & answers.ne("")).any(axis=1)]
+            pieces.append(piece.assign(PSLO=i, _row=piece.index))
+        if not pieces:
+            return
+        long = pd.concat(pieces, ignore_index=True).sort_values(["_row", "PSLO"], kind="stable")
+        long = long.reindex(columns=KEY_COLUMNS + ["PSLO"] + self.headers)
+        for row in long.itertuples(index=False, name=None):
+            self.sheet.append(row)
+
+
+def _cells(frame):
+    # openpyxl wants plain Python values: None for missing answers and NaT
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None)
+
+
+def write_workbook(batches, plan, path):
+    workbook = Workbook(write_only=True)
+    sheets = []
+    for part in plan.layout:
+        columns = [c for c in plan.columns if c.section == part.id]
+        if isinstance(part, PsloLoop):
+            sheets.append(_PsloSheet(workbook, part.id, columns))
+        else:
+            sheets.append(_SectionSheet(workbook, part.id, [c.name for c in columns]))
+
+    rows = 0
+    for frame in batches:
+        frame = _cells(frame.reset_index(drop=True))
+        for sheet in sheets:
+            sheet.write(frame)
+        rows += len(frame)
+    workbook.save(path)
+    return rows
+
+
+def export_store(store, plan, directory=None):
+    fd, path = tempfile.mkstemp(prefix="ap_reviews_", suffix=".xlsx", dir=directory)
+    os.close(fd)
+    try:
+        write_workbook(store.iter_batches(batch_size=BATCH_SIZE), plan, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path